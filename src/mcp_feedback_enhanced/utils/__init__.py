@@ -10,6 +10,7 @@ from .telegram_manager import (
     TelegramBotManager,
     TelegramMessageChunker,
     TelegramRateLimiter,
+    close_shared_session,
     send_telegram_message,
     test_telegram_connection,
 )
@@ -39,6 +40,7 @@ from .mcp_telegram_bridge import (
     initialize_bridge,
     start_bridge,
     stop_bridge,
+    use_bridge,
     create_telegram_session,
     end_telegram_session,
     get_telegram_feedback,
@@ -77,6 +79,7 @@ __all__ = [
     "TelegramBotManager",
     "TelegramMessageChunker",
     "TelegramRateLimiter",
+    "close_shared_session",
     "send_telegram_message",
     "test_telegram_connection",
     "MCPLoggingMiddleware",
@@ -100,6 +103,7 @@ __all__ = [
     "initialize_bridge",
     "start_bridge",
     "stop_bridge",
+    "use_bridge",
     "create_telegram_session",
     "end_telegram_session",
     "get_telegram_feedback",
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+JSON Serialization Helpers
+==========================
+
+Thin wrappers around JSON encoding and decoding that use orjson when it is
+installed and fall back to the standard library otherwise. For plain JSON
+data (str keys, strings, finite numbers, bools, None, lists, tuples and
+dicts) both backends produce UTF-8 output without ASCII escaping, compact or
+with two-space indentation.
+
+With orjson the results differ from ``json.dumps``/``json.loads`` in these
+cases:
+
+- NaN and Infinity are written as ``null``, and ``loads`` rejects them
+  with ValueError instead of returning float values
+- datetime, date, time, UUID, dataclass and Enum values are serialized
+  instead of raising TypeError
+- int, float, bool and None dict keys become strings as with the standard
+  library, but date and datetime keys are also accepted
+- floats in exponent form are written without a plus sign or zero padding
+  (``1e16`` rather than ``1e+16``)
+
+Integers beyond 64 bits, which orjson cannot encode, are passed to the
+standard library, so they still serialize.
+
+Install the ``speedups`` extra to enable orjson:
+
+    pip install mcp-feedback-enhanced[speedups]
+
+Author: MCP Feedback Enhanced Team
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None  # type: ignore[assignment]
+
+
+HAS_ORJSON = orjson is not None
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: Object to serialize
+        indent: Whether to indent the output with two spaces
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # Types orjson cannot handle (e.g. huge ints) go through stdlib
+            pass
+    return _stdlib_dumps(obj, indent).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to a JSON string.
+
+    Args:
+        obj: Object to serialize
+        indent: Whether to indent the output with two spaces
+
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return dumps_bytes(obj, indent).decode("utf-8")
+    return _stdlib_dumps(obj, indent)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    Deserialize JSON from a string or bytes.
+
+    Raises:
+        ValueError: If the input is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any, indent: bool) -> str:
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
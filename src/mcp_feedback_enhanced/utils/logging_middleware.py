@@ -205,6 +205,8 @@ class MCPLoggingMiddleware:
         
         # Telegram forwarding callback
         self.telegram_callback: Optional[Callable[[MCPLogEntry], None]] = None
+        self._telegram_is_async = False
+        self._forward_telegram: Callable[[MCPLogEntry], None] = self._forward_sync
         
         debug_log("MCPLoggingMiddleware initialized", "MIDDLEWARE")
     
@@ -216,8 +218,21 @@ class MCPLoggingMiddleware:
     def set_telegram_callback(self, callback: Callable[[MCPLogEntry], None]):
         """Set the callback function for Telegram forwarding"""
         self.telegram_callback = callback
+        # Resolve sync/async dispatch once here instead of on every log entry
+        self._telegram_is_async = asyncio.iscoroutinefunction(callback)
+        self._forward_telegram = (
+            self._forward_async if self._telegram_is_async else self._forward_sync
+        )
         debug_log("Telegram callback set", "MIDDLEWARE")
     
+    def _forward_async(self, entry: MCPLogEntry):
+        """Schedule an async Telegram callback in the running event loop"""
+        asyncio.create_task(self.telegram_callback(entry))
+    
+    def _forward_sync(self, entry: MCPLogEntry):
+        """Invoke a sync Telegram callback directly"""
+        self.telegram_callback(entry)
+    
     def _generate_call_id(self, tool_name: str, timestamp: str) -> str:
         """Generate a unique call ID for tracking"""
         return f"{tool_name}_{timestamp}_{id(self)}"
@@ -240,11 +255,7 @@ class MCPLoggingMiddleware:
         # Telegram forwarding
         if self.enable_telegram_forwarding and self.telegram_callback:
             try:
-                if asyncio.iscoroutinefunction(self.telegram_callback):
-                    # Schedule the coroutine to run in the event loop
-                    asyncio.create_task(self.telegram_callback(entry))
-                else:
-                    self.telegram_callback(entry)
+                self._forward_telegram(entry)
             except Exception as e:
                 debug_log(f"Error in Telegram forwarding: {e}", "MIDDLEWARE")
         
@@ -20,16 +20,21 @@ Author: MCP Feedback Enhanced Team
 """
 
 import asyncio
-import json
+import hashlib
+import itertools
+import random
 import time
-import uuid
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Callable, Set
-from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Callable, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
-from ..debug import debug_log
-from .telegram_manager import TelegramBotManager
+from ..debug import debug_log, is_debug_enabled
+from . import json_utils
+from .telegram_manager import TelegramBotManager, close_shared_session
 from .logging_middleware import MCPLoggingMiddleware, MCPLogEntry, MCPEventType
 from .message_chunker import MessageChunker, chunk_text, chunk_mcp_response
 
@@ -51,7 +56,65 @@ class MessageType(Enum):
     SESSION_UPDATE = "session_update"
 
 
-@dataclass
+# Direct value -> member lookup, bypassing Enum.__call__ on deserialization
+_MESSAGE_TYPE_BY_VALUE: Dict[str, MessageType] = {m.value: m for m in MessageType}
+
+
+class CorrelationCache:
+    """
+    Bounded mapping of Telegram message IDs to MCP call IDs.
+
+    Entries expire after ``ttl_seconds`` and the oldest entries are evicted
+    once ``maxsize`` is reached, so correlations cannot grow without bound
+    on a long-running bridge. All entries share one TTL, so insertion order
+    is also expiry order and pruning only ever touches the front.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl_seconds: float = 1800):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def _prune(self, now: float):
+        """Drop expired entries from the front of the mapping"""
+        data = self._data
+        while data:
+            key, (_, expires_at) = next(iter(data.items()))
+            if expires_at > now:
+                break
+            del data[key]
+
+    def __setitem__(self, key: str, value: str):
+        now = time.monotonic()
+        self._prune(now)
+        self._data.pop(key, None)
+        self._data[key] = (value, now + self.ttl_seconds)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def __len__(self) -> int:
+        self._prune(time.monotonic())
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[str]:
+        self._prune(time.monotonic())
+        return iter(list(self._data))
+
+    def clear(self):
+        self._data.clear()
+
+
+@dataclass(slots=True, frozen=True)
 class BridgeMessage:
     """Message structure for bridge communication"""
     id: str
@@ -66,35 +129,53 @@ class BridgeMessage:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        result = asdict(self)
-        result['message_type'] = self.message_type.value
-        return result
+        # Built by hand: asdict() recursively deep-copies every field
+        return {
+            'id': self.id,
+            'message_type': self.message_type.value,
+            'timestamp': self.timestamp,
+            'session_id': self.session_id,
+            'content': self.content,
+            'metadata': self.metadata,
+            'telegram_message_id': self.telegram_message_id,
+            'mcp_call_id': self.mcp_call_id,
+            'user_id': self.user_id
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'BridgeMessage':
         """Create from dictionary"""
-        data['message_type'] = MessageType(data['message_type'])
+        value = data['message_type']
+        message_type = _MESSAGE_TYPE_BY_VALUE.get(value)
+        # Fall back to the Enum constructor for members and invalid values
+        data['message_type'] = message_type if message_type is not None else MessageType(value)
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class TelegramSession:
     """Telegram session information"""
     session_id: str
     chat_id: str
     project_directory: str
     start_time: datetime
-    last_activity: datetime
     active_mcp_calls: Set[str]
     pending_responses: Dict[str, Dict[str, Any]]
     user_context: Dict[str, Any]
+    last_activity_mono: float = field(default_factory=time.monotonic)
+    # Wall-clock time of the last activity, for display only; expiry uses
+    # the monotonic timestamp above
+    last_activity: datetime = field(default_factory=datetime.now)
     
-    def is_expired(self, timeout_minutes: int = 30) -> bool:
+    def is_expired(self, timeout_minutes: int = 30, now: Optional[float] = None) -> bool:
         """Check if session is expired"""
-        return datetime.now() - self.last_activity > timedelta(minutes=timeout_minutes)
+        if now is None:
+            now = time.monotonic()
+        return now - self.last_activity_mono > timeout_minutes * 60
     
     def update_activity(self):
         """Update last activity timestamp"""
+        self.last_activity_mono = time.monotonic()
         self.last_activity = datetime.now()
 
 
@@ -128,24 +209,53 @@ class MCPTelegramBridge:
         # Bridge state
         self.status = BridgeStatus.DISCONNECTED
         self.is_running = False
+        self._background_tasks: List[asyncio.Task] = []
+        
+        # Bridge message IDs only need to be unique within this process
+        self._message_seq = itertools.count()
+        
+        # MCP events waiting to be forwarded as one batched message
+        self._event_buffer: List[MCPLogEntry] = []
+        self._flush_task: Optional[asyncio.Task] = None
         
         # Session management
         self.active_sessions: Dict[str, TelegramSession] = {}
-        self.message_correlation: Dict[str, str] = {}  # telegram_msg_id -> mcp_call_id
+        self.chat_to_session: Dict[str, str] = {}  # chat_id -> session_id
         self.pending_feedback: Dict[str, Dict[str, Any]] = {}  # session_id -> feedback_data
         
-        # WebSocket connections for live updates
+        # Next getUpdates offset (highest seen update_id + 1)
+        self._telegram_offset = 0
+        
+        # Per-chat inbound queues: ordered within a chat, concurrent across chats
+        self._chat_queues: Dict[str, asyncio.Queue] = {}
+        self._chat_workers: Dict[str, asyncio.Task] = {}
+        
+        # WebSocket connections for live updates, fed by a broadcaster task
         self.websocket_connections: Set[Any] = set()
+        self._ws_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=self.config.get('websocket_queue_size', 1024)
+        )
         
         # Event handlers
-        self.message_handlers: Dict[MessageType, List[Callable]] = {
+        # (handler, is_async) pairs, classified once at registration
+        self.message_handlers: Dict[MessageType, List[Tuple[Callable, bool]]] = {
             message_type: [] for message_type in MessageType
         }
         
         # Configuration
         self.session_timeout_minutes = self.config.get('session_timeout_minutes', 30)
+        
+        # telegram_msg_id -> mcp_call_id, expired with the session timeout
+        self.message_correlation = CorrelationCache(
+            maxsize=self.config.get('max_message_correlations', 10_000),
+            ttl_seconds=self.session_timeout_minutes * 60
+        )
         self.max_concurrent_sessions = self.config.get('max_concurrent_sessions', 10)
         self.enable_auto_forwarding = self.config.get('enable_auto_forwarding', True)
+        self.websocket_send_timeout = self.config.get('websocket_send_timeout', 2.0)
+        self.chat_worker_idle_timeout = self.config.get('chat_worker_idle_timeout', 60.0)
+        self.poll_timeout = self.config.get('poll_timeout', 30)
+        self.event_batch_window = self.config.get('event_batch_window', 0.5)
         self.message_format_config = self.config.get('message_format', {
             'include_session_id': True,
             'include_timestamp': True,
@@ -162,6 +272,10 @@ class MCPTelegramBridge:
             add_navigation=chunker_config.get('add_navigation', True),
             add_previews=chunker_config.get('add_previews', True)
         )
+        
+        # Rendered chunk text by message digest, least recently used first
+        self.chunk_cache_size = chunker_config.get('cache_size', 256)
+        self._chunk_cache: "OrderedDict[bytes, List[str]]" = OrderedDict()
 
         debug_log("MCPTelegramBridge initialized", "BRIDGE")
     
@@ -188,8 +302,11 @@ class MCPTelegramBridge:
             
             # Start background tasks
             self.is_running = True
-            asyncio.create_task(self._session_cleanup_task())
-            asyncio.create_task(self._telegram_polling_task())
+            self._background_tasks = [
+                asyncio.create_task(self._session_cleanup_task()),
+                asyncio.create_task(self._telegram_polling_task()),
+                asyncio.create_task(self._websocket_broadcaster_task())
+            ]
             
             self.status = BridgeStatus.CONNECTED
             debug_log("MCP-Telegram bridge started successfully", "BRIDGE")
@@ -214,6 +331,19 @@ class MCPTelegramBridge:
         self.is_running = False
         self.status = BridgeStatus.DISCONNECTED
         
+        # Cancel background tasks instead of waiting for them to notice is_running
+        tasks = self._background_tasks + list(self._chat_workers.values())
+        if self._flush_task is not None:
+            tasks.append(self._flush_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._background_tasks = []
+        self._chat_workers.clear()
+        self._chat_queues.clear()
+        self._flush_task = None
+        self._event_buffer.clear()
+        
         # Send shutdown notification
         await self._send_system_notification("🔌 MCP-Telegram Bridge Disconnected", {
             "status": "disconnected",
@@ -223,14 +353,24 @@ class MCPTelegramBridge:
         
         # Cleanup sessions
         self.active_sessions.clear()
+        self.chat_to_session.clear()
         self.message_correlation.clear()
         self.pending_feedback.clear()
         
+        # Release the HTTP session used by the one-shot Telegram helpers
+        await close_shared_session()
+        
         debug_log("MCP-Telegram bridge stopped", "BRIDGE")
     
+    def _next_message_id(self) -> str:
+        """Generate a process-unique bridge message ID"""
+        return f"bm-{next(self._message_seq):x}-{int(time.time())}"
+    
     def add_message_handler(self, message_type: MessageType, handler: Callable[[BridgeMessage], None]):
         """Add a message handler for specific message types"""
-        self.message_handlers[message_type].append(handler)
+        self.message_handlers[message_type].append(
+            (handler, asyncio.iscoroutinefunction(handler))
+        )
         debug_log(f"Added message handler for {message_type.value}", "BRIDGE")
     
     def add_websocket_connection(self, websocket):
@@ -272,13 +412,15 @@ class MCPTelegramBridge:
                 chat_id=chat_id,
                 project_directory=project_directory,
                 start_time=datetime.now(),
-                last_activity=datetime.now(),
                 active_mcp_calls=set(),
                 pending_responses={},
                 user_context=user_context or {}
             )
             
             self.active_sessions[session_id] = session
+            # Replies on a chat go to its oldest active session, so only map
+            # the chat if it has none yet
+            self.chat_to_session.setdefault(chat_id, session_id)
             
             # Send session start notification
             await self._send_session_notification(session_id, "🎯 New MCP Session Started", {
@@ -311,23 +453,27 @@ class MCPTelegramBridge:
                 return False
             
             # Send session end notification
-            duration = datetime.now() - session.start_time
+            end_time = datetime.now()
+            duration = end_time - session.start_time
             await self._send_session_notification(session_id, "🏁 MCP Session Completed", {
                 "session_id": session_id,
                 "duration_minutes": int(duration.total_seconds() / 60),
                 "mcp_calls_count": len(session.active_mcp_calls),
-                "end_time": datetime.now().isoformat()
+                "end_time": end_time.isoformat()
             })
             
             # Cleanup session data
             del self.active_sessions[session_id]
             self.pending_feedback.pop(session_id, None)
             
-            # Cleanup message correlations
-            to_remove = [msg_id for msg_id, call_id in self.message_correlation.items() 
-                        if call_id in session.active_mcp_calls]
-            for msg_id in to_remove:
-                del self.message_correlation[msg_id]
+            # Cleanup reverse index, falling back to the oldest remaining session
+            # on the same chat
+            if self.chat_to_session.get(session.chat_id) == session_id:
+                del self.chat_to_session[session.chat_id]
+                for sid, sess in self.active_sessions.items():
+                    if sess.chat_id == session.chat_id:
+                        self.chat_to_session[session.chat_id] = sid
+                        break
             
             debug_log(f"Ended Telegram session: {session_id}", "BRIDGE")
             return True
@@ -348,7 +494,7 @@ class MCPTelegramBridge:
             session_id: Session identifier
             mcp_call_id: MCP call identifier
             message: Message content
-            metadata: Additional metadata
+            metadata: Additional metadata, extended in place with chunk details
 
         Returns:
             List of Telegram message IDs if sent successfully
@@ -359,21 +505,15 @@ class MCPTelegramBridge:
                 debug_log(f"Session not found for MCP message: {session_id}", "BRIDGE")
                 return None
 
-            # Chunk the message intelligently
-            chunks = self.message_chunker.chunk_message(message)
-
-            # If message is large, create a summary chunk first
-            if len(chunks) > 3:
-                summary_chunk = self.message_chunker.create_summary_chunk(chunks, message)
-                chunks.insert(0, summary_chunk)
+            # Chunk and render the message (cached for repeated content)
+            chunks = self._render_chunks(message)
 
             telegram_msg_ids = []
+            session.active_mcp_calls.add(mcp_call_id)
 
-            # Send each chunk
-            for i, chunk in enumerate(chunks):
-                chunk_message = chunk.to_telegram_message(include_metadata=True)
-
-                # Send chunk to Telegram
+            # Send chunks one at a time so they appear in order in the chat;
+            # the Telegram manager's rate limiter paces the API calls
+            for i, chunk_message in enumerate(chunks):
                 result = await self.telegram_manager.send_message(chunk_message, parse_mode=None)
 
                 if result:
@@ -381,13 +521,7 @@ class MCPTelegramBridge:
                     telegram_msg_ids.append(telegram_msg_id)
 
                     # Store correlation for each chunk
-                    chunk_call_id = f"{mcp_call_id}_chunk_{i}"
-                    self.message_correlation[str(telegram_msg_id)] = chunk_call_id
-                    session.active_mcp_calls.add(chunk_call_id)
-
-                    # Small delay between chunks to avoid rate limiting
-                    if i < len(chunks) - 1:
-                        await asyncio.sleep(0.5)
+                    self.message_correlation[str(telegram_msg_id)] = f"{mcp_call_id}_chunk_{i}"
                 else:
                     debug_log(f"Failed to send chunk {i+1}/{len(chunks)}", "BRIDGE")
                     break
@@ -395,28 +529,28 @@ class MCPTelegramBridge:
             if telegram_msg_ids:
                 session.update_activity()
 
-                # Create bridge message for the complete message
-                bridge_msg = BridgeMessage(
-                    id=str(uuid.uuid4()),
-                    message_type=MessageType.MCP_TO_TELEGRAM,
-                    timestamp=datetime.now().isoformat(),
-                    session_id=session_id,
-                    content=message,
-                    metadata={
-                        **(metadata or {}),
-                        "chunks_sent": len(telegram_msg_ids),
-                        "total_chunks": len(chunks),
-                        "telegram_message_ids": telegram_msg_ids
-                    },
-                    telegram_message_id=telegram_msg_ids[0] if telegram_msg_ids else None,
-                    mcp_call_id=mcp_call_id
-                )
+                # Notify handlers, skipping message construction when nobody listens
+                if self.message_handlers[MessageType.MCP_TO_TELEGRAM]:
+                    bridge_metadata = metadata if metadata is not None else {}
+                    bridge_metadata["chunks_sent"] = len(telegram_msg_ids)
+                    bridge_metadata["total_chunks"] = len(chunks)
+                    bridge_metadata["telegram_message_ids"] = telegram_msg_ids
+                    
+                    bridge_msg = BridgeMessage(
+                        id=self._next_message_id(),
+                        message_type=MessageType.MCP_TO_TELEGRAM,
+                        timestamp=datetime.now().isoformat(),
+                        session_id=session_id,
+                        content=message,
+                        metadata=bridge_metadata,
+                        telegram_message_id=telegram_msg_ids[0] if telegram_msg_ids else None,
+                        mcp_call_id=mcp_call_id
+                    )
 
-                # Notify handlers
-                await self._notify_message_handlers(bridge_msg)
+                    await self._notify_message_handlers(bridge_msg)
 
                 # Send WebSocket update
-                await self._send_websocket_update({
+                self._send_websocket_update({
                     "type": "mcp_message_sent",
                     "session_id": session_id,
                     "telegram_message_ids": telegram_msg_ids,
@@ -424,7 +558,8 @@ class MCPTelegramBridge:
                     "chunks_sent": len(telegram_msg_ids)
                 })
 
-                debug_log(f"Sent MCP message to Telegram in {len(telegram_msg_ids)} chunks: {telegram_msg_ids}", "BRIDGE")
+                if is_debug_enabled():
+                    debug_log(f"Sent MCP message to Telegram in {len(telegram_msg_ids)} chunks: {telegram_msg_ids}", "BRIDGE")
                 return telegram_msg_ids
 
             return None
@@ -433,6 +568,32 @@ class MCPTelegramBridge:
             debug_log(f"Failed to send MCP message to Telegram: {e}", "BRIDGE")
             return None
     
+    def _render_chunks(self, message: str) -> List[str]:
+        """
+        Chunk a message and render each chunk to its Telegram text.
+        
+        Rendered chunks are cached by content digest so identical MCP
+        outputs (e.g. repeated status events) skip the chunker entirely.
+        """
+        key = hashlib.blake2b(message.encode('utf-8'), digest_size=16).digest()
+        rendered = self._chunk_cache.get(key)
+        if rendered is not None:
+            self._chunk_cache.move_to_end(key)
+            return rendered
+        
+        chunks = self.message_chunker.chunk_message(message)
+        
+        # If message is large, create a summary chunk first
+        if len(chunks) > 3:
+            summary_chunk = self.message_chunker.create_summary_chunk(chunks, message)
+            chunks.insert(0, summary_chunk)
+        
+        rendered = [chunk.to_telegram_message(include_metadata=True) for chunk in chunks]
+        self._chunk_cache[key] = rendered
+        if len(self._chunk_cache) > self.chunk_cache_size:
+            self._chunk_cache.popitem(last=False)
+        return rendered
+    
     async def handle_telegram_response(self, 
                                      telegram_message: Dict[str, Any]) -> bool:
         """
@@ -450,16 +611,12 @@ class MCPTelegramBridge:
             reply_to_message_id = telegram_message.get('reply_to_message', {}).get('message_id')
             
             # Find session by chat_id
-            session = None
-            session_id = None
-            for sid, sess in self.active_sessions.items():
-                if sess.chat_id == chat_id:
-                    session = sess
-                    session_id = sid
-                    break
+            session_id = self.chat_to_session.get(chat_id)
+            session = self.active_sessions.get(session_id) if session_id else None
             
             if not session:
-                debug_log(f"No active session found for chat: {chat_id}", "BRIDGE")
+                if is_debug_enabled():
+                    debug_log(f"No active session found for chat: {chat_id}", "BRIDGE")
                 return False
             
             # Find MCP call correlation
@@ -479,31 +636,32 @@ class MCPTelegramBridge:
             self.pending_feedback[session_id] = feedback_data
             session.update_activity()
             
-            # Create bridge message
-            bridge_msg = BridgeMessage(
-                id=str(uuid.uuid4()),
-                message_type=MessageType.TELEGRAM_TO_MCP,
-                timestamp=datetime.now().isoformat(),
-                session_id=session_id,
-                content=message_text,
-                metadata=feedback_data,
-                telegram_message_id=telegram_message.get('message_id'),
-                mcp_call_id=mcp_call_id,
-                user_id=str(telegram_message.get('from', {}).get('id', ''))
-            )
+            # Notify handlers, skipping message construction when nobody listens
+            if self.message_handlers[MessageType.TELEGRAM_TO_MCP]:
+                bridge_msg = BridgeMessage(
+                    id=self._next_message_id(),
+                    message_type=MessageType.TELEGRAM_TO_MCP,
+                    timestamp=datetime.now().isoformat(),
+                    session_id=session_id,
+                    content=message_text,
+                    metadata=feedback_data,
+                    telegram_message_id=telegram_message.get('message_id'),
+                    mcp_call_id=mcp_call_id,
+                    user_id=str(telegram_message.get('from', {}).get('id', ''))
+                )
             
-            # Notify handlers
-            await self._notify_message_handlers(bridge_msg)
+                await self._notify_message_handlers(bridge_msg)
             
             # Send WebSocket update
-            await self._send_websocket_update({
+            self._send_websocket_update({
                 "type": "telegram_response_received",
                 "session_id": session_id,
                 "message_text": message_text,
                 "mcp_call_id": mcp_call_id
             })
             
-            debug_log(f"Handled Telegram response for session: {session_id}", "BRIDGE")
+            if is_debug_enabled():
+                debug_log(f"Handled Telegram response for session: {session_id}", "BRIDGE")
             return True
             
         except Exception as e:
@@ -554,48 +712,88 @@ class MCPTelegramBridge:
                                           MCPEventType.TOOL_CALL_ERROR]:
                 return
             
-            # Find active session (for now, use the first active session)
-            # In a real implementation, you'd correlate by session_id
             if not self.active_sessions:
                 return
             
-            session_id = list(self.active_sessions.keys())[0]
-            session = self.active_sessions[session_id]
+            # Coalesce bursts of events into a single Telegram message
+            self._event_buffer.append(log_entry)
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(
+                    self._flush_mcp_events_after(self.event_batch_window)
+                )
+            
+        except Exception as e:
+            debug_log(f"Error handling MCP event: {e}", "BRIDGE")
+    
+    async def _flush_mcp_events_after(self, delay: float):
+        """Forward buffered MCP events to Telegram once the batch window closes"""
+        try:
+            await asyncio.sleep(delay)
+            
+            entries, self._event_buffer = self._event_buffer, []
+            # Events arriving while this batch is sent start a new window
+            self._flush_task = None
+            if not entries:
+                return
+            
+            # Find active session (for now, use the first active session)
+            # In a real implementation, you'd correlate by session_id
+            session_id = next(iter(self.active_sessions), None)
+            if session_id is None:
+                return
             
             # Format message for Telegram
-            telegram_message = log_entry.to_telegram_message(
-                include_details=self.message_format_config.get('include_details', True)
+            include_details = self.message_format_config.get('include_details', True)
+            telegram_message = "\n\n---\n\n".join(
+                entry.to_telegram_message(include_details=include_details) for entry in entries
             )
             
+            first_entry = entries[0]
+            if len(entries) == 1:
+                metadata = {
+                    "event_type": first_entry.event_type.value,
+                    "tool_name": first_entry.tool_name,
+                    "success": first_entry.success
+                }
+            else:
+                metadata = {
+                    "event_count": len(entries),
+                    "event_types": [entry.event_type.value for entry in entries],
+                    "tool_names": [entry.tool_name for entry in entries],
+                    "success": all(entry.success for entry in entries)
+                }
+            
             # Send to Telegram
             await self.send_mcp_message_to_telegram(
                 session_id=session_id,
-                mcp_call_id=f"{log_entry.tool_name}_{log_entry.timestamp}",
+                mcp_call_id=f"{first_entry.tool_name}_{first_entry.timestamp}",
                 message=telegram_message,
-                metadata={
-                    "event_type": log_entry.event_type.value,
-                    "tool_name": log_entry.tool_name,
-                    "success": log_entry.success
-                }
+                metadata=metadata
             )
             
         except Exception as e:
-            debug_log(f"Error handling MCP event: {e}", "BRIDGE")
+            debug_log(f"Error forwarding MCP events: {e}", "BRIDGE")
     
     async def _telegram_polling_task(self):
         """Background task for polling Telegram messages"""
         try:
             while self.is_running:
                 try:
-                    # Get updates from Telegram
-                    updates = await self.telegram_manager.get_updates(timeout=10)
+                    # Long-poll Telegram; the request itself blocks until updates arrive
+                    poll_started = time.monotonic()
+                    updates = await self.telegram_manager.get_updates(
+                        offset=self._telegram_offset, timeout=self.poll_timeout
+                    )
                     
                     for update in updates:
+                        self._telegram_offset = max(self._telegram_offset, update['update_id'] + 1)
                         if 'message' in update:
-                            await self.handle_telegram_response(update['message'])
+                            self._dispatch_telegram_message(update['message'])
                     
-                    # Small delay to prevent excessive polling
-                    await asyncio.sleep(1)
+                    # An empty result that returned early means the request failed;
+                    # back off instead of spinning
+                    if not updates and time.monotonic() - poll_started < 1:
+                        await asyncio.sleep(1)
                     
                 except Exception as e:
                     debug_log(f"Error in Telegram polling: {e}", "BRIDGE")
@@ -604,24 +802,60 @@ class MCPTelegramBridge:
         except Exception as e:
             debug_log(f"Telegram polling task failed: {e}", "BRIDGE")
     
+    def _dispatch_telegram_message(self, telegram_message: Dict[str, Any]):
+        """Queue a Telegram message on its chat's worker, starting one if needed"""
+        chat_id = str(telegram_message.get('chat', {}).get('id', ''))
+        
+        queue = self._chat_queues.get(chat_id)
+        if queue is None:
+            queue = self._chat_queues[chat_id] = asyncio.Queue()
+        queue.put_nowait(telegram_message)
+        
+        worker = self._chat_workers.get(chat_id)
+        if worker is None or worker.done():
+            self._chat_workers[chat_id] = asyncio.create_task(self._chat_worker(chat_id, queue))
+    
+    async def _chat_worker(self, chat_id: str, queue: asyncio.Queue):
+        """Handle one chat's messages in order, exiting once the chat goes idle"""
+        try:
+            while True:
+                try:
+                    telegram_message = await asyncio.wait_for(
+                        queue.get(), timeout=self.chat_worker_idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        break
+                    continue
+                
+                await self.handle_telegram_response(telegram_message)
+        finally:
+            if self._chat_workers.get(chat_id) is asyncio.current_task():
+                del self._chat_workers[chat_id]
+                self._chat_queues.pop(chat_id, None)
+    
     async def _session_cleanup_task(self):
         """Background task for cleaning up expired sessions"""
         try:
             while self.is_running:
                 try:
-                    current_time = datetime.now()
+                    now = time.monotonic()
                     expired_sessions = []
                     
                     for session_id, session in self.active_sessions.items():
-                        if session.is_expired(self.session_timeout_minutes):
+                        if session.is_expired(self.session_timeout_minutes, now):
                             expired_sessions.append(session_id)
                     
-                    for session_id in expired_sessions:
-                        debug_log(f"Cleaning up expired session: {session_id}", "BRIDGE")
-                        await self.end_session(session_id)
+                    if expired_sessions:
+                        debug_log(f"Cleaning up expired sessions: {expired_sessions}", "BRIDGE")
+                        # Shielded so cancellation on stop() can't leave a session half-ended
+                        await asyncio.shield(asyncio.gather(
+                            *[self.end_session(session_id) for session_id in expired_sessions],
+                            return_exceptions=True
+                        ))
                     
-                    # Run cleanup every 5 minutes
-                    await asyncio.sleep(300)
+                    # Run cleanup every 5 minutes, jittered so bridges don't align
+                    await asyncio.sleep(300 + random.uniform(-30, 30))  # noqa: S311
                     
                 except Exception as e:
                     debug_log(f"Error in session cleanup: {e}", "BRIDGE")
@@ -636,16 +870,17 @@ class MCPTelegramBridge:
             if self.status == BridgeStatus.CONNECTED:
                 await self.telegram_manager.send_message(message, parse_mode=None)
                 
-                # Create bridge message
-                bridge_msg = BridgeMessage(
-                    id=str(uuid.uuid4()),
-                    message_type=MessageType.SYSTEM_NOTIFICATION,
-                    timestamp=datetime.now().isoformat(),
-                    content=message,
-                    metadata=metadata
-                )
-                
-                await self._notify_message_handlers(bridge_msg)
+                # Notify handlers, skipping message construction when nobody listens
+                if self.message_handlers[MessageType.SYSTEM_NOTIFICATION]:
+                    bridge_msg = BridgeMessage(
+                        id=self._next_message_id(),
+                        message_type=MessageType.SYSTEM_NOTIFICATION,
+                        timestamp=datetime.now().isoformat(),
+                        content=message,
+                        metadata=metadata
+                    )
+                    
+                    await self._notify_message_handlers(bridge_msg)
                 
         except Exception as e:
             debug_log(f"Failed to send system notification: {e}", "BRIDGE")
@@ -657,28 +892,32 @@ class MCPTelegramBridge:
             if session and self.status == BridgeStatus.CONNECTED:
                 await self.telegram_manager.send_message(message, parse_mode=None)
                 
-                # Create bridge message
-                bridge_msg = BridgeMessage(
-                    id=str(uuid.uuid4()),
-                    message_type=MessageType.SESSION_UPDATE,
-                    timestamp=datetime.now().isoformat(),
-                    session_id=session_id,
-                    content=message,
-                    metadata=metadata
-                )
-                
-                await self._notify_message_handlers(bridge_msg)
+                # Notify handlers, skipping message construction when nobody listens
+                if self.message_handlers[MessageType.SESSION_UPDATE]:
+                    bridge_msg = BridgeMessage(
+                        id=self._next_message_id(),
+                        message_type=MessageType.SESSION_UPDATE,
+                        timestamp=datetime.now().isoformat(),
+                        session_id=session_id,
+                        content=message,
+                        metadata=metadata
+                    )
+                    
+                    await self._notify_message_handlers(bridge_msg)
                 
         except Exception as e:
             debug_log(f"Failed to send session notification: {e}", "BRIDGE")
     
     async def _notify_message_handlers(self, bridge_msg: BridgeMessage):
         """Notify all registered message handlers"""
+        handlers = self.message_handlers[bridge_msg.message_type]
+        if not handlers:
+            return
+        
         try:
-            handlers = self.message_handlers.get(bridge_msg.message_type, [])
-            for handler in handlers:
+            for handler, is_async in handlers:
                 try:
-                    if asyncio.iscoroutinefunction(handler):
+                    if is_async:
                         await handler(bridge_msg)
                     else:
                         handler(bridge_msg)
@@ -688,36 +927,78 @@ class MCPTelegramBridge:
         except Exception as e:
             debug_log(f"Error notifying message handlers: {e}", "BRIDGE")
     
-    async def _send_websocket_update(self, data: Dict[str, Any]):
+    def _send_websocket_update(self, data: Dict[str, Any]):
+        """Queue an update for the WebSocket broadcaster without waiting on clients"""
+        if not self.websocket_connections:
+            return
+        
+        try:
+            self._ws_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # Drop updates rather than let slow clients back up the bridge
+            debug_log("WebSocket update queue full, dropping update", "BRIDGE")
+    
+    async def _websocket_broadcaster_task(self):
+        """Background task that fans queued updates out to WebSocket clients"""
+        while True:
+            data = await self._ws_queue.get()
+            await self._broadcast_websocket_update(data)
+    
+    async def _broadcast_websocket_update(self, data: Dict[str, Any]):
         """Send update to all connected WebSocket clients"""
         try:
             if not self.websocket_connections:
                 return
             
-            message = json.dumps(data)
-            disconnected = set()
+            # Encode once for all clients; the dashboard parses text frames
+            message = json_utils.dumps(data)
+            connections = list(self.websocket_connections)
             
-            for websocket in self.websocket_connections:
-                try:
-                    await websocket.send_text(message)
-                except Exception:
-                    disconnected.add(websocket)
+            # Broadcast concurrently so one slow client cannot stall the others
+            results = await asyncio.gather(
+                *[asyncio.wait_for(websocket.send_text(message), timeout=self.websocket_send_timeout)
+                  for websocket in connections],
+                return_exceptions=True
+            )
             
-            # Remove disconnected WebSockets
-            for websocket in disconnected:
-                self.websocket_connections.discard(websocket)
+            # Remove disconnected or stuck WebSockets
+            for websocket, result in zip(connections, results):
+                if isinstance(result, BaseException):
+                    self.websocket_connections.discard(websocket)
                 
         except Exception as e:
             debug_log(f"Error sending WebSocket update: {e}", "BRIDGE")
 
 
-# Global bridge instance
+# Global bridge instance, shared by every thread (including the web server's)
 _global_bridge: Optional[MCPTelegramBridge] = None
 
+# Context-local override of the global bridge, set through use_bridge()
+_bridge_var: ContextVar[Optional[MCPTelegramBridge]] = ContextVar('mcp_telegram_bridge', default=None)
+
+
+@contextmanager
+def use_bridge(bridge: MCPTelegramBridge) -> Iterator[MCPTelegramBridge]:
+    """
+    Make get_bridge() return the given bridge within the current context.
+    
+    The override is visible to code and tasks started inside the block and
+    is undone on exit, e.g. to isolate a test or task from the global bridge:
+    
+        with use_bridge(bridge):
+            ...
+    """
+    token = _bridge_var.set(bridge)
+    try:
+        yield bridge
+    finally:
+        _bridge_var.reset(token)
+
 
 def get_bridge() -> Optional[MCPTelegramBridge]:
-    """Get the global bridge instance"""
-    return _global_bridge
+    """Get the bridge for the current context, falling back to the global instance"""
+    bridge = _bridge_var.get()
+    return bridge if bridge is not None else _global_bridge
 
 
 def initialize_bridge(telegram_manager: TelegramBotManager,
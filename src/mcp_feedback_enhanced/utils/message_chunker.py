@@ -22,11 +22,14 @@ Author: MCP Feedback Enhanced Team
 import re
 import json
 import math
-from typing import List, Dict, Any, Optional, Tuple, Union
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
 from ..debug import debug_log
+from . import json_utils
 
 
 class ChunkType(Enum):
@@ -49,7 +52,7 @@ class ChunkStrategy(Enum):
     CHARACTER_BOUNDARY = "character_boundary"
 
 
-@dataclass
+@dataclass(slots=True)
 class ChunkMetadata:
     """Metadata for a message chunk"""
     chunk_index: int
@@ -64,7 +67,7 @@ class ChunkMetadata:
     continuation_marker: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageChunk:
     """A single message chunk with metadata"""
     content: str
@@ -98,6 +101,11 @@ class MessageChunk:
         return "\n".join(lines)
 
 
+# Raw output of a chunking strategy: (content, chunk type, strategy used).
+# Chunk objects are only built once the final metadata is known.
+_ChunkPiece = Tuple[str, ChunkType, ChunkStrategy]
+
+
 class MessageChunker:
     """
     Intelligent message chunking system for Telegram integration.
@@ -121,13 +129,19 @@ class MessageChunker:
         'strikethrough': re.compile(r'~~[^~]+~~'),
         'link': re.compile(r'\[([^\]]+)\]\(([^)]+)\)'),
     }
+    # All markdown patterns as one alternation, so detection is a single scan
+    _MARKDOWN_ANY_RE = re.compile('|'.join(p.pattern for p in MARKDOWN_PATTERNS.values()))
+    _SENTENCE_END_RE = re.compile(r'[.!?]\s+')
+    # Paired emphasis markers and backticks, removed from previews in one pass
+    _MARKDOWN_STRIP_RE = re.compile(r'\*\*|__|~~|`')
     
     def __init__(self, 
                  max_chunk_size: int = SAFE_MESSAGE_LENGTH,
                  preserve_code_blocks: bool = True,
                  preserve_markdown: bool = True,
                  add_navigation: bool = True,
-                 add_previews: bool = True):
+                 add_previews: bool = True,
+                 cache_size: int = 256):
         """
         Initialize the message chunker.
         
@@ -137,6 +151,7 @@ class MessageChunker:
             preserve_markdown: Whether to preserve markdown formatting
             add_navigation: Whether to add navigation info to chunks
             add_previews: Whether to add content previews
+            cache_size: Number of recent contents whose detection results are kept
         """
         self.max_chunk_size = max_chunk_size
         self.preserve_code_blocks = preserve_code_blocks
@@ -144,6 +159,21 @@ class MessageChunker:
         self.add_navigation = add_navigation
         self.add_previews = add_previews
         
+        # Detection results for recently seen content, keyed by digest
+        self.cache_size = cache_size
+        self._type_cache: "OrderedDict[bytes, ChunkType]" = OrderedDict()
+        self._flag_cache: "OrderedDict[bytes, Tuple[bool, bool]]" = OrderedDict()
+        
+        # Strategy dispatch table
+        self._strategy_dispatch: Dict[ChunkStrategy, Callable[[str, ChunkType], Iterator[_ChunkPiece]]] = {
+            ChunkStrategy.CODE_BLOCK_BOUNDARY: self._chunk_by_code_blocks,
+            ChunkStrategy.PARAGRAPH_BOUNDARY: self._chunk_by_paragraphs,
+            ChunkStrategy.SENTENCE_BOUNDARY: self._chunk_by_sentences,
+            ChunkStrategy.LINE_BOUNDARY: self._chunk_by_lines,
+            ChunkStrategy.WORD_BOUNDARY: self._chunk_by_words,
+            ChunkStrategy.CHARACTER_BOUNDARY: self._chunk_by_characters,
+        }
+        
         debug_log("MessageChunker initialized", "CHUNKER")
     
     def chunk_message(self, 
@@ -161,47 +191,117 @@ class MessageChunker:
         Returns:
             List of MessageChunk objects
         """
-        if not content or not content.strip():
+        prepared = self._prepare_content(content, title, content_type)
+        if prepared is None:
             return []
-        
-        # Detect content type if not provided
-        if content_type is None:
-            content_type = self._detect_content_type(content)
-        
-        # Add title if provided
-        if title:
-            content = f"**{title}**\n\n{content}"
+        content, content_type, has_code, has_markdown = prepared
         
         # Check if chunking is needed
         if len(content) <= self.max_chunk_size:
-            chunk = MessageChunk(
-                content=content,
-                metadata=ChunkMetadata(
-                    chunk_index=0,
-                    total_chunks=1,
-                    chunk_type=content_type,
-                    strategy_used=ChunkStrategy.SENTENCE_BOUNDARY,
-                    original_length=len(content),
-                    chunk_length=len(content),
-                    has_code=self._has_code_blocks(content),
-                    has_markdown=self._has_markdown(content),
-                    context_preserved=True
-                )
-            )
-            return [chunk]
+            return [self._single_chunk(content, content_type, has_code, has_markdown)]
         
         # Choose chunking strategy based on content type
         strategy = self._choose_chunking_strategy(content, content_type)
         
         # Perform chunking
-        chunks = self._chunk_by_strategy(content, strategy, content_type)
-        
-        # Add navigation and metadata
-        self._add_chunk_metadata(chunks, content, content_type)
+        pieces = list(self._chunk_by_strategy(content, strategy, content_type))
+        
+        # Build chunks with navigation and metadata
+        total_chunks = len(pieces)
+        chunks = [
+            self._build_chunk(piece, i, total_chunks, content, has_code, has_markdown,
+                              is_last=i == total_chunks - 1)
+            for i, piece in enumerate(pieces)
+        ]
         
         debug_log(f"Chunked message into {len(chunks)} parts using {strategy.value}", "CHUNKER")
         return chunks
     
+    def iter_chunk_message(self, 
+                           content: str, 
+                           title: Optional[str] = None,
+                           content_type: Optional[ChunkType] = None) -> Iterator[MessageChunk]:
+        """
+        Lazily chunk a message, yielding each chunk as soon as it is ready.
+        
+        Produces the same chunk contents as chunk_message without holding the
+        whole list in memory. The total number of chunks is not known up front:
+        total_chunks is 0 on every chunk except the last, which carries the
+        exact total, and navigation info omits the "of N" part.
+        
+        Args:
+            content: Content to chunk
+            title: Optional title for the content
+            content_type: Hint about the content type
+            
+        Yields:
+            MessageChunk objects in order
+        """
+        prepared = self._prepare_content(content, title, content_type)
+        if prepared is None:
+            return
+        content, content_type, has_code, has_markdown = prepared
+        
+        if len(content) <= self.max_chunk_size:
+            yield self._single_chunk(content, content_type, has_code, has_markdown)
+            return
+        
+        strategy = self._choose_chunking_strategy(content, content_type)
+        
+        # Hold one chunk back so we know whether it is the last one
+        pending = None
+        index = 0
+        for piece in self._chunk_by_strategy(content, strategy, content_type):
+            if pending is not None:
+                yield self._build_chunk(pending, index, 0, content, has_code, has_markdown, is_last=False)
+                index += 1
+            pending = piece
+        
+        if pending is not None:
+            yield self._build_chunk(pending, index, index + 1, content, has_code, has_markdown, is_last=True)
+    
+    def _prepare_content(self,
+                         content: str,
+                         title: Optional[str],
+                         content_type: Optional[ChunkType]) -> Optional[Tuple[str, ChunkType, bool, bool]]:
+        """Detect type, add the title and scan flags; None for blank content"""
+        if not content or not content.strip():
+            return None
+        
+        key = self._content_key(content)
+        
+        # Detect content type if not provided
+        if content_type is None:
+            content_type = self._cached(self._type_cache, key, self._detect_content_type, content)
+        
+        # Add title if provided
+        if title:
+            content = f"**{title}**\n\n{content}"
+            key = self._content_key(content)
+        
+        # Scan the whole content once; a chunk cannot contain code or markdown
+        # that the full content lacks, so negative results skip per-chunk scans
+        has_code, has_markdown = self._cached(self._flag_cache, key, self._scan_flags, content)
+        return content, content_type, has_code, has_markdown
+    
+    def _single_chunk(self, content: str, content_type: ChunkType,
+                      has_code: bool, has_markdown: bool) -> MessageChunk:
+        """Wrap content that fits in one message"""
+        return MessageChunk(
+            content=content,
+            metadata=ChunkMetadata(
+                chunk_index=0,
+                total_chunks=1,
+                chunk_type=content_type,
+                strategy_used=ChunkStrategy.SENTENCE_BOUNDARY,
+                original_length=len(content),
+                chunk_length=len(content),
+                has_code=has_code,
+                has_markdown=has_markdown,
+                context_preserved=True
+            )
+        )
+    
     def chunk_mcp_response(self, 
                           mcp_data: Dict[str, Any],
                           include_metadata: bool = True) -> List[MessageChunk]:
@@ -268,7 +368,7 @@ class MessageChunker:
                 pass  # Keep as string
         
         if isinstance(data, (dict, list)):
-            json_str = json.dumps(data, indent=2, ensure_ascii=False)
+            json_str = json_utils.dumps(data, indent=True)
         else:
             json_str = str(data)
         
@@ -341,34 +441,61 @@ class MessageChunker:
     
     def _detect_content_type(self, content: str) -> ChunkType:
         """Detect the type of content"""
-        # Check for code blocks
-        if self.CODE_BLOCK_PATTERN.search(content):
+        # Check for code blocks (the regex can only match if a fence exists)
+        if '```' in content and self.CODE_BLOCK_PATTERN.search(content):
             return ChunkType.CODE
         
         # Check for JSON-like content
         stripped = content.strip()
-        if (stripped.startswith('{') and stripped.endswith('}')) or \
-           (stripped.startswith('[') and stripped.endswith(']')):
+        if ((stripped.startswith('{') and stripped.endswith('}')) or
+                (stripped.startswith('[') and stripped.endswith(']'))) and \
+                self._could_be_json(stripped):
             try:
                 json.loads(stripped)
                 return ChunkType.JSON
             except json.JSONDecodeError:
                 pass
         
-        # Check for list-like content
+        # Count list and table lines in a single pass
         lines = content.split('\n')
-        list_lines = sum(1 for line in lines if re.match(r'^\s*[-*•]\s+', line))
-        if list_lines > len(lines) * 0.5:
-            return ChunkType.LIST
+        list_threshold = len(lines) * 0.5
+        table_threshold = len(lines) * 0.3
+        list_lines = 0
+        table_lines = 0
+        for line in lines:
+            if '|' in line:
+                table_lines += 1
+            stripped_line = line.lstrip()
+            if stripped_line and stripped_line[0] in '-*•' and stripped_line[1:2].isspace():
+                list_lines += 1
+                # List wins over table, so the answer is settled here
+                if list_lines > list_threshold:
+                    return ChunkType.LIST
         
         # Check for table-like content
-        table_lines = sum(1 for line in lines if '|' in line)
-        if table_lines > len(lines) * 0.3:
+        if table_lines > table_threshold:
             return ChunkType.TABLE
         
         # Default to text
         return ChunkType.TEXT
     
+    @staticmethod
+    def _could_be_json(stripped: str) -> bool:
+        """
+        Cheap structural test run before a full json.loads.
+        
+        The first significant character after the opening bracket must be able
+        to start a JSON key or value. This rejects Python reprs, templates and
+        bracketed prose without parsing the whole document.
+        """
+        inner = stripped[1:].lstrip()
+        if not inner:
+            return False
+        if stripped[0] == '{':
+            return inner[0] in '"}'
+        # json.loads also accepts NaN and Infinity
+        return inner[0] in '"{[]-0123456789tfnNI'
+    
     def _detect_mcp_content_type(self, mcp_data: Dict[str, Any]) -> ChunkType:
         """Detect content type from MCP data"""
         # Check for code in response
@@ -385,14 +512,39 @@ class MessageChunker:
         
         return ChunkType.MIXED
     
+    @staticmethod
+    def _content_key(content: str) -> bytes:
+        """Digest used to key the detection caches"""
+        return hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    
+    def _cached(self, cache: OrderedDict, key: bytes, compute: Callable[[str], Any], content: str) -> Any:
+        """Return compute(content) from an LRU cache keyed by content digest"""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            return value
+        
+        value = compute(content)
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+    
+    def _scan_flags(self, content: str) -> Tuple[bool, bool]:
+        """Return (has_code, has_markdown) for content"""
+        return self._has_code_blocks(content), self._has_markdown(content)
+    
     def _has_code_blocks(self, content: str) -> bool:
         """Check if content has code blocks"""
+        # Both patterns need a backtick; most plain messages have none
+        if '`' not in content:
+            return False
         return bool(self.CODE_BLOCK_PATTERN.search(content) or 
                    self.INLINE_CODE_PATTERN.search(content))
     
     def _has_markdown(self, content: str) -> bool:
         """Check if content has markdown formatting"""
-        return any(pattern.search(content) for pattern in self.MARKDOWN_PATTERNS.values())
+        return self._MARKDOWN_ANY_RE.search(content) is not None
     
     def _choose_chunking_strategy(self, content: str, content_type: ChunkType) -> ChunkStrategy:
         """Choose the best chunking strategy for the content"""
@@ -421,286 +573,230 @@ class MessageChunker:
     def _chunk_by_strategy(self, 
                           content: str, 
                           strategy: ChunkStrategy,
-                          content_type: ChunkType) -> List[MessageChunk]:
+                          content_type: ChunkType) -> Iterator[_ChunkPiece]:
         """Chunk content using the specified strategy"""
-        if strategy == ChunkStrategy.CODE_BLOCK_BOUNDARY:
-            return self._chunk_by_code_blocks(content, content_type)
-        elif strategy == ChunkStrategy.PARAGRAPH_BOUNDARY:
-            return self._chunk_by_paragraphs(content, content_type)
-        elif strategy == ChunkStrategy.SENTENCE_BOUNDARY:
-            return self._chunk_by_sentences(content, content_type)
-        elif strategy == ChunkStrategy.LINE_BOUNDARY:
-            return self._chunk_by_lines(content, content_type)
-        elif strategy == ChunkStrategy.WORD_BOUNDARY:
-            return self._chunk_by_words(content, content_type)
-        else:  # CHARACTER_BOUNDARY
-            return self._chunk_by_characters(content, content_type)
-    
-    def _chunk_by_code_blocks(self, content: str, content_type: ChunkType) -> List[MessageChunk]:
-        """Chunk content preserving code block boundaries"""
-        chunks = []
-        current_chunk = ""
-        
-        # Split by code blocks
-        parts = self.CODE_BLOCK_PATTERN.split(content)
-        code_blocks = self.CODE_BLOCK_PATTERN.findall(content)
-        
-        i = 0
-        code_index = 0
-        
-        while i < len(parts):
-            # Add text part
-            if parts[i]:
-                if len(current_chunk + parts[i]) <= self.max_chunk_size:
-                    current_chunk += parts[i]
-                else:
-                    if current_chunk:
-                        chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.CODE_BLOCK_BOUNDARY))
-                    current_chunk = parts[i]
-            
-            # Add code block if available
-            if code_index < len(code_blocks):
-                code_block = code_blocks[code_index]
-                if len(current_chunk + code_block) <= self.max_chunk_size:
-                    current_chunk += code_block
-                else:
-                    if current_chunk:
-                        chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.CODE_BLOCK_BOUNDARY))
-                    # Handle large code blocks
-                    if len(code_block) > self.max_chunk_size:
-                        # Split large code block by lines
-                        code_chunks = self._chunk_large_code_block(code_block)
-                        chunks.extend(code_chunks)
-                        current_chunk = ""
-                    else:
-                        current_chunk = code_block
-                code_index += 1
-            
-            i += 1
-        
-        if current_chunk:
-            chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.CODE_BLOCK_BOUNDARY))
-        
-        return chunks
+        return self._strategy_dispatch[strategy](content, content_type)
     
-    def _chunk_by_paragraphs(self, content: str, content_type: ChunkType) -> List[MessageChunk]:
-        """Chunk content by paragraph boundaries"""
-        paragraphs = content.split('\n\n')
-        chunks = []
-        current_chunk = ""
-        
-        for paragraph in paragraphs:
-            if not paragraph.strip():
+    def _chunk_by_code_blocks(self, content: str, content_type: ChunkType) -> Iterator[_ChunkPiece]:
+        """Chunk content preserving code block boundaries"""
+        current_parts: List[str] = []
+        current_len = 0
+        
+        for piece, is_code in self._iter_code_block_parts(content):
+            piece_len = len(piece)
+            if current_len + piece_len <= self.max_chunk_size:
+                current_parts.append(piece)
+                current_len += piece_len
                 continue
             
-            # Check if adding this paragraph would exceed the limit
-            test_chunk = current_chunk + ('\n\n' if current_chunk else '') + paragraph
+            if current_len:
+                yield "".join(current_parts), content_type, ChunkStrategy.CODE_BLOCK_BOUNDARY
             
-            if len(test_chunk) <= self.max_chunk_size:
-                current_chunk = test_chunk
+            if is_code and piece_len > self.max_chunk_size:
+                # Split large code block by lines
+                yield from self._chunk_large_code_block(piece)
+                current_parts = []
+                current_len = 0
             else:
-                # Save current chunk if it has content
-                if current_chunk:
-                    chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.PARAGRAPH_BOUNDARY))
-                
-                # Handle large paragraphs
-                if len(paragraph) > self.max_chunk_size:
-                    # Split large paragraph by sentences
-                    sentence_chunks = self._chunk_by_sentences(paragraph, content_type)
-                    chunks.extend(sentence_chunks)
-                    current_chunk = ""
-                else:
-                    current_chunk = paragraph
-        
-        if current_chunk:
-            chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.PARAGRAPH_BOUNDARY))
+                current_parts = [piece]
+                current_len = piece_len
         
-        return chunks
+        if current_len:
+            yield "".join(current_parts), content_type, ChunkStrategy.CODE_BLOCK_BOUNDARY
+    
+    def _iter_code_block_parts(self, content: str) -> Iterator[Tuple[str, bool]]:
+        """Yield (text, is_code) pieces of content from a single regex scan"""
+        pos = 0
+        for match in self.CODE_BLOCK_PATTERN.finditer(content):
+            if match.start() > pos:
+                yield content[pos:match.start()], False
+            yield match.group(0), True
+            pos = match.end()
+        if pos < len(content):
+            yield content[pos:], False
+    
+    def _chunk_by_paragraphs(self, content: str, content_type: ChunkType) -> Iterator[_ChunkPiece]:
+        """Chunk content by paragraph boundaries"""
+        paragraphs = [p for p in content.split('\n\n') if p.strip()]
+        # Split large paragraphs by sentences
+        return self._pack_segments(paragraphs, '\n\n', content_type,
+                                   ChunkStrategy.PARAGRAPH_BOUNDARY, self._chunk_by_sentences)
     
-    def _chunk_by_sentences(self, content: str, content_type: ChunkType) -> List[MessageChunk]:
+    def _chunk_by_sentences(self, content: str, content_type: ChunkType) -> Iterator[_ChunkPiece]:
         """Chunk content by sentence boundaries"""
-        # Simple sentence splitting (can be improved with NLP)
-        sentences = re.split(r'(?<=[.!?])\s+', content)
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            if not sentence.strip():
-                continue
-            
-            test_chunk = current_chunk + (' ' if current_chunk else '') + sentence
-            
-            if len(test_chunk) <= self.max_chunk_size:
-                current_chunk = test_chunk
-            else:
-                if current_chunk:
-                    chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.SENTENCE_BOUNDARY))
-                
-                # Handle very long sentences
-                if len(sentence) > self.max_chunk_size:
-                    word_chunks = self._chunk_by_words(sentence, content_type)
-                    chunks.extend(word_chunks)
-                    current_chunk = ""
-                else:
-                    current_chunk = sentence
-        
-        if current_chunk:
-            chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.SENTENCE_BOUNDARY))
+        # Handle very long sentences by words
+        return self._pack_segments(self._iter_sentences(content), ' ', content_type,
+                                   ChunkStrategy.SENTENCE_BOUNDARY, self._chunk_by_words)
+    
+    def _iter_sentences(self, content: str) -> Iterator[str]:
+        """
+        Yield non-blank sentences lazily.
         
-        return chunks
+        Simple splitting on whitespace after '.', '!' or '?' (can be improved
+        with NLP); sentences are sliced out as they are found rather than
+        materialized into a list up front.
+        """
+        pos = 0
+        for match in self._SENTENCE_END_RE.finditer(content):
+            sentence = content[pos:match.start() + 1]
+            if not sentence.isspace():
+                yield sentence
+            pos = match.end()
+        tail = content[pos:]
+        if tail and not tail.isspace():
+            yield tail
     
-    def _chunk_by_lines(self, content: str, content_type: ChunkType) -> List[MessageChunk]:
+    def _chunk_by_lines(self, content: str, content_type: ChunkType) -> Iterator[_ChunkPiece]:
         """Chunk content by line boundaries"""
-        lines = content.split('\n')
-        chunks = []
-        current_chunk = ""
-        
-        for line in lines:
-            test_chunk = current_chunk + ('\n' if current_chunk else '') + line
-            
-            if len(test_chunk) <= self.max_chunk_size:
-                current_chunk = test_chunk
-            else:
-                if current_chunk:
-                    chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.LINE_BOUNDARY))
-                
-                # Handle very long lines
-                if len(line) > self.max_chunk_size:
-                    word_chunks = self._chunk_by_words(line, content_type)
-                    chunks.extend(word_chunks)
-                    current_chunk = ""
-                else:
-                    current_chunk = line
-        
-        if current_chunk:
-            chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.LINE_BOUNDARY))
-        
-        return chunks
+        # Handle very long lines by words
+        return self._pack_segments(content.split('\n'), '\n', content_type,
+                                   ChunkStrategy.LINE_BOUNDARY, self._chunk_by_words)
     
-    def _chunk_by_words(self, content: str, content_type: ChunkType) -> List[MessageChunk]:
+    def _chunk_by_words(self, content: str, content_type: ChunkType) -> Iterator[_ChunkPiece]:
         """Chunk content by word boundaries"""
-        words = content.split()
-        chunks = []
-        current_chunk = ""
+        # Handle very long words by characters
+        return self._pack_segments(content.split(), ' ', content_type,
+                                   ChunkStrategy.WORD_BOUNDARY, self._chunk_by_characters)
+    
+    def _pack_segments(self,
+                       segments: Iterable[str],
+                       separator: str,
+                       content_type: ChunkType,
+                       strategy: ChunkStrategy,
+                       split_oversized: Callable[[str, ChunkType], Iterable[_ChunkPiece]]) -> Iterator[_ChunkPiece]:
+        """
+        Greedily pack segments into chunks joined by separator.
         
-        for word in words:
-            test_chunk = current_chunk + (' ' if current_chunk else '') + word
+        Parts are collected in a list and the running length is tracked as an
+        integer, so each chunk string is built exactly once when it is emitted.
+        Segments longer than max_chunk_size are handed to split_oversized.
+        """
+        current_parts: List[str] = []
+        current_len = 0
+        separator_len = len(separator)
+        
+        for segment in segments:
+            segment_len = len(segment)
+            new_len = current_len + separator_len + segment_len if current_len else segment_len
             
-            if len(test_chunk) <= self.max_chunk_size:
-                current_chunk = test_chunk
-            else:
-                if current_chunk:
-                    chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.WORD_BOUNDARY))
-                
-                # Handle very long words
-                if len(word) > self.max_chunk_size:
-                    char_chunks = self._chunk_by_characters(word, content_type)
-                    chunks.extend(char_chunks)
-                    current_chunk = ""
+            if new_len <= self.max_chunk_size:
+                if current_len:
+                    current_parts.append(segment)
                 else:
-                    current_chunk = word
-        
-        if current_chunk:
-            chunks.append(self._create_chunk(current_chunk, content_type, ChunkStrategy.WORD_BOUNDARY))
+                    current_parts = [segment]
+                current_len = new_len
+                continue
+            
+            if current_len:
+                yield separator.join(current_parts), content_type, strategy
+            
+            if segment_len > self.max_chunk_size:
+                yield from split_oversized(segment, content_type)
+                current_parts = []
+                current_len = 0
+            else:
+                current_parts = [segment]
+                current_len = segment_len
         
-        return chunks
+        if current_len:
+            yield separator.join(current_parts), content_type, strategy
     
-    def _chunk_by_characters(self, content: str, content_type: ChunkType) -> List[MessageChunk]:
+    def _chunk_by_characters(self, content: str, content_type: ChunkType) -> Iterator[_ChunkPiece]:
         """Chunk content by character boundaries (last resort)"""
-        chunks = []
+        size = self.max_chunk_size
+        strategy = ChunkStrategy.CHARACTER_BOUNDARY
         
-        for i in range(0, len(content), self.max_chunk_size):
-            chunk_content = content[i:i + self.max_chunk_size]
-            chunks.append(self._create_chunk(chunk_content, content_type, ChunkStrategy.CHARACTER_BOUNDARY))
-        
-        return chunks
+        # Fixed-size slices
+        return ((content[i:i + size], content_type, strategy) for i in range(0, len(content), size))
     
-    def _chunk_large_code_block(self, code_block: str) -> List[MessageChunk]:
+    def _chunk_large_code_block(self, code_block: str) -> Iterator[_ChunkPiece]:
         """Handle large code blocks by splitting them intelligently"""
-        # Extract language and content
+        # Extract language and code lines
         lines = code_block.split('\n')
         if lines[0].startswith('```'):
             language = lines[0][3:].strip()
-            code_content = '\n'.join(lines[1:-1])
-            has_closing = lines[-1] == '```'
+            code_lines = lines[1:-1] or ['']
         else:
             language = ""
-            code_content = code_block
-            has_closing = False
+            code_lines = lines
         
-        # Split code content by lines
-        code_lines = code_content.split('\n')
-        chunks = []
         current_lines = []
+        current_len = 0
+        
+        # Size of the ```language\n ... \n``` wrapper around each chunk
+        wrapper_len = len(language) + 8
         
         for line in code_lines:
             # Calculate size with code block wrapper
-            test_content = '\n'.join(current_lines + [line])
-            test_block = f"```{language}\n{test_content}\n```"
+            new_len = current_len + len(line) + (1 if current_lines else 0)
             
-            if len(test_block) <= self.max_chunk_size:
+            if new_len + wrapper_len <= self.max_chunk_size:
                 current_lines.append(line)
+                current_len = new_len
             else:
                 if current_lines:
                     # Create chunk with code block wrapper
                     chunk_content = f"```{language}\n{chr(10).join(current_lines)}\n```"
-                    chunks.append(self._create_chunk(chunk_content, ChunkType.CODE, ChunkStrategy.CODE_BLOCK_BOUNDARY))
+                    yield chunk_content, ChunkType.CODE, ChunkStrategy.CODE_BLOCK_BOUNDARY
                 current_lines = [line]
+                current_len = len(line)
         
         if current_lines:
             chunk_content = f"```{language}\n{chr(10).join(current_lines)}\n```"
-            chunks.append(self._create_chunk(chunk_content, ChunkType.CODE, ChunkStrategy.CODE_BLOCK_BOUNDARY))
-        
-        return chunks
+            yield chunk_content, ChunkType.CODE, ChunkStrategy.CODE_BLOCK_BOUNDARY
     
-    def _create_chunk(self, 
-                     content: str, 
-                     content_type: ChunkType,
-                     strategy: ChunkStrategy) -> MessageChunk:
-        """Create a MessageChunk with basic metadata"""
+    def _build_chunk(self,
+                     piece: _ChunkPiece,
+                     index: int,
+                     total_chunks: int,
+                     original_content: str,
+                     content_has_code: bool,
+                     content_has_markdown: bool,
+                     is_last: bool) -> MessageChunk:
+        """
+        Build the final MessageChunk for one strategy piece.
+        
+        total_chunks is 0 when unknown. content_has_code and
+        content_has_markdown describe the whole original content; when either
+        is False the matching per-chunk scan is skipped.
+        """
+        content, chunk_type, strategy = piece
+        multipart = not is_last or index > 0
+        
+        # Add navigation info
+        navigation_info = None
+        if self.add_navigation and multipart:
+            if total_chunks:
+                navigation_info = f"📄 **Part {index + 1} of {total_chunks}**"
+            else:
+                navigation_info = f"📄 **Part {index + 1}**"
+        
+        # Add preview for first chunk
+        preview = None
+        if index == 0 and self.add_previews and multipart:
+            content_preview = self._generate_content_preview(original_content, max_length=100)
+            if content_preview:
+                preview = f"Preview: {content_preview}..."
+        
         return MessageChunk(
             content=content,
             metadata=ChunkMetadata(
-                chunk_index=0,  # Will be updated later
-                total_chunks=0,  # Will be updated later
-                chunk_type=content_type,
+                chunk_index=index,
+                total_chunks=total_chunks,
+                chunk_type=chunk_type,
                 strategy_used=strategy,
-                original_length=0,  # Will be updated later
+                original_length=len(original_content),
                 chunk_length=len(content),
-                has_code=self._has_code_blocks(content),
-                has_markdown=self._has_markdown(content),
-                context_preserved=True
-            )
+                has_code=content_has_code and self._has_code_blocks(content),
+                has_markdown=content_has_markdown and self._has_markdown(content),
+                context_preserved=True,
+                # Add continuation marker
+                continuation_marker=None if is_last else "⬇️ *Continued in next message...*"
+            ),
+            preview=preview,
+            navigation_info=navigation_info
         )
     
-    def _add_chunk_metadata(self, 
-                           chunks: List[MessageChunk], 
-                           original_content: str,
-                           content_type: ChunkType):
-        """Add metadata to all chunks"""
-        total_chunks = len(chunks)
-        original_length = len(original_content)
-        
-        for i, chunk in enumerate(chunks):
-            # Update metadata
-            chunk.metadata.chunk_index = i
-            chunk.metadata.total_chunks = total_chunks
-            chunk.metadata.original_length = original_length
-            
-            # Add navigation info
-            if self.add_navigation and total_chunks > 1:
-                chunk.navigation_info = f"📄 **Part {i + 1} of {total_chunks}**"
-            
-            # Add continuation marker
-            if i < total_chunks - 1:
-                chunk.metadata.continuation_marker = "⬇️ *Continued in next message...*"
-            
-            # Add preview for first chunk
-            if i == 0 and self.add_previews and total_chunks > 1:
-                preview = self._generate_content_preview(original_content, max_length=100)
-                if preview:
-                    chunk.preview = f"Preview: {preview}..."
-    
     def _format_mcp_response(self, mcp_data: Dict[str, Any], include_metadata: bool) -> str:
         """Format MCP response data for display"""
         lines = []
@@ -712,7 +808,7 @@ class MessageChunker:
             lines.append(str(mcp_data['message']))
         elif 'result' in mcp_data:
             if isinstance(mcp_data['result'], (dict, list)):
-                lines.append(json.dumps(mcp_data['result'], indent=2, ensure_ascii=False))
+                lines.append(json_utils.dumps(mcp_data['result'], indent=True))
             else:
                 lines.append(str(mcp_data['result']))
         
@@ -738,10 +834,23 @@ class MessageChunker:
                 return str(mcp_data[key])
         return None
     
+    def _strip_markdown(self, content: str) -> str:
+        """Remove bold, underline and strikethrough markers and backticks"""
+        return self._MARKDOWN_STRIP_RE.sub('', content)
+    
     def _generate_content_preview(self, content: str, max_length: int = 200) -> str:
         """Generate a preview of the content"""
-        # Remove extra whitespace
-        preview = ' '.join(content.split())
+        # Strip markdown and remove extra whitespace, looking only at a growing
+        # prefix. A marker split at the cut can leave one stray character in
+        # the prefix result, plus the space separating it, so only its last
+        # few characters may differ from the result for the whole; once it is
+        # longer than max_length by more than that the rest is irrelevant
+        window = max(max_length * 2, 64)
+        while True:
+            preview = ' '.join(self._strip_markdown(content[:window]).split())
+            if len(preview) > max_length + 3 or window >= len(content):
+                break
+            window *= 4
         
         # Truncate if too long
         if len(preview) > max_length:
@@ -8,9 +8,16 @@ Handles rule matching, priority resolution, and configuration application.
 """
 
 import fnmatch
+import heapq
+import os
 import re
+import sys
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ..debug import debug_log
 from .error_handler import ErrorHandler, ErrorType
@@ -22,6 +29,68 @@ class RulesEngineError(Exception):
     pass
 
 
+# Indexed rule: (priority rank, project filter or None, rule)
+_IndexedRule = Tuple[int, Optional[Dict[str, Any]], Dict[str, Any]]
+
+# Collected rule effects: (overrides, headers in output order, footers)
+_RuleEffects = Tuple[Dict[str, Any], Tuple[str, ...], Tuple[str, ...]]
+
+
+_VALID_RULE_TYPES = frozenset({
+    "auto_submit_override", "timeout_override", "response_header",
+    "response_footer", "template_override", "custom_config"
+})
+
+_VALID_MESSAGE_TYPES = frozenset({
+    "general", "code_review", "error_report", "feature_request",
+    "documentation", "testing", "deployment", "security"
+})
+
+
+# Rule effect handlers: (rule, value, overrides, headers, footers)
+def _apply_auto_submit(rule, value, overrides, headers, footers):
+    overrides["auto_submit"] = bool(value)
+    # Also apply timeout override if specified
+    if "timeout_override" in rule:
+        overrides["timeout"] = rule["timeout_override"]
+
+
+def _apply_timeout(rule, value, overrides, headers, footers):
+    overrides["timeout"] = value
+
+
+def _apply_header(rule, value, overrides, headers, footers):
+    headers.append(str(value))
+
+
+def _apply_footer(rule, value, overrides, headers, footers):
+    footers.append(str(value))
+
+
+def _apply_template(rule, value, overrides, headers, footers):
+    overrides["template_id"] = value
+
+
+def _apply_custom_config(rule, value, overrides, headers, footers):
+    # Merge custom configuration
+    if isinstance(value, dict):
+        overrides.update(value)
+        if "response_text" in value:
+            # Replaces the text earlier headers/footers were added to
+            headers.clear()
+            footers.clear()
+
+
+_RULE_HANDLERS: Dict[str, Callable[..., None]] = {
+    "auto_submit_override": _apply_auto_submit,
+    "timeout_override": _apply_timeout,
+    "response_header": _apply_header,
+    "response_footer": _apply_footer,
+    "template_override": _apply_template,
+    "custom_config": _apply_custom_config,
+}
+
+
 class MessageTypeRulesEngine:
     """
     Core rules engine for message type rules
@@ -44,6 +113,28 @@ class MessageTypeRulesEngine:
         self._rules_cache = None
         self._cache_timestamp = 0
         
+        # Rules rarely change, so the file mtime is checked at most this often
+        self._stat_interval = 0.25
+        self._stat_check_at = 0.0
+        
+        # Combined glob regexes keyed by pattern list, built on first use
+        self._pattern_cache: Dict[Tuple[str, ...], "re.Pattern[str]"] = {}
+        
+        # Compiled regex filters keyed by pattern; None marks an invalid pattern
+        self._regex_cache: Dict[str, Optional["re.Pattern[str]"]] = {}
+        
+        # Enabled rules bucketed by message_type, rebuilt whenever the rules data changes
+        self._indexed_rules_data: Optional[Dict[str, Any]] = None
+        self._rules_by_type: Dict[str, List[_IndexedRule]] = {}
+        self._wildcard_rules: List[_IndexedRule] = []
+        self._rule_ids: Dict[str, int] = {}
+        self._index_generation = 0
+        
+        # Rule effects for recent (message_type, project) pairs, keyed with the
+        # index generation so stale entries are never hit
+        self._apply_cache: "OrderedDict[tuple, _RuleEffects]" = OrderedDict()
+        self._apply_cache_size = 256
+        
         debug_log("🔧 Rules engine initialized")
     
     def apply_rules(self, message_type: str, project_directory: str, base_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -61,26 +152,22 @@ class MessageTypeRulesEngine:
         try:
             debug_log(f"🎯 Applying rules for message_type='{message_type}', project='{project_directory}'")
             
-            # Get applicable rules
-            applicable_rules = self.find_applicable_rules(message_type, project_directory)
+            # Rule effects only depend on the message type, the project and
+            # the loaded rules, not on the per-call base_config
+            self._get_rule_index()
+            cache_key = (message_type, project_directory, self._index_generation)
             
-            if not applicable_rules:
-                debug_log("📝 No applicable rules found")
-                return base_config.copy()
+            effects = self._apply_cache.get(cache_key)
+            if effects is not None:
+                self._apply_cache.move_to_end(cache_key)
+                debug_log("♻️ Reusing cached rule effects")
+            else:
+                effects = self._collect_effects(message_type, project_directory)
+                self._apply_cache[cache_key] = effects
+                if len(self._apply_cache) > self._apply_cache_size:
+                    self._apply_cache.popitem(last=False)
             
-            # Apply rules in priority order
-            config = base_config.copy()
-            applied_rules = []
-            
-            for rule in applicable_rules:
-                try:
-                    self._apply_single_rule(rule, config)
-                    applied_rules.append(rule["id"])
-                except Exception as e:
-                    debug_log(f"⚠️ Failed to apply rule {rule.get('id', 'unknown')}: {e}")
-            
-            debug_log(f"✅ Applied {len(applied_rules)} rules: {applied_rules}")
-            return config
+            return self._merge_effects(base_config, effects)
             
         except Exception as e:
             error_id = ErrorHandler.log_error_with_context(
@@ -94,6 +181,47 @@ class MessageTypeRulesEngine:
             debug_log(f"❌ Rules application failed [Error ID: {error_id}]: {e}")
             return base_config.copy()
     
+    def _collect_effects(self, message_type: str, project_directory: str) -> _RuleEffects:
+        """Collect the overrides, headers and footers of the applicable rules"""
+        # Get applicable rules
+        applicable_rules = self.find_applicable_rules(message_type, project_directory)
+        
+        if not applicable_rules:
+            debug_log("📝 No applicable rules found")
+            return {}, (), ()
+        
+        # Collect rule effects in priority order
+        overrides: Dict[str, Any] = {}
+        headers: List[str] = []
+        footers: List[str] = []
+        applied_rules = []
+        
+        for rule in applicable_rules:
+            try:
+                self._apply_single_rule(rule, overrides, headers, footers)
+                applied_rules.append(rule["id"])
+            except Exception as e:
+                debug_log(f"⚠️ Failed to apply rule {rule.get('id', 'unknown')}: {e}")
+        
+        debug_log(f"✅ Applied {len(applied_rules)} rules: {applied_rules}")
+        # Later headers go in front of earlier ones
+        return overrides, tuple(reversed(headers)), tuple(footers)
+    
+    @staticmethod
+    def _merge_effects(base_config: Dict[str, Any], effects: _RuleEffects) -> Dict[str, Any]:
+        """Build a new config from base_config and collected rule effects"""
+        overrides, headers, footers = effects
+        config = {**base_config, **overrides}
+        if headers or footers:
+            response_text = config.get("response_text", "")
+            if isinstance(response_text, str):
+                config["response_text"] = "".join(headers) + response_text + "".join(footers)
+            else:
+                # Only the header/footer rules fail; other overrides still apply
+                debug_log(f"⚠️ Skipped response header/footer rules: response_text is "
+                          f"{type(response_text).__name__}, not str")
+        return config
+    
     def find_applicable_rules(self, message_type: str, project_directory: str) -> List[Dict[str, Any]]:
         """
         Find rules applicable to the given message type and project
@@ -106,15 +234,22 @@ class MessageTypeRulesEngine:
             List of applicable rules sorted by priority (highest first)
         """
         try:
-            rules_data = self._get_rules()
-            applicable_rules = []
-            
-            for rule in rules_data.get("rules", []):
-                if self._is_rule_applicable(rule, message_type, project_directory):
-                    applicable_rules.append(rule)
-            
-            # Sort by priority (highest first)
-            applicable_rules.sort(key=lambda r: r.get("priority", 0), reverse=True)
+            rules_by_type, wildcard_rules = self._get_rule_index()
+            if type(message_type) is str:
+                message_type = sys.intern(message_type)
+            candidates = rules_by_type.get(message_type, [])
+            if wildcard_rules:
+                # Both buckets are already in rank order
+                candidates = heapq.merge(candidates, wildcard_rules, key=itemgetter(0))
+            
+            # Candidates are enabled, match message_type and are already in
+            # priority order (highest first); only project filters remain
+            normalized = self._normalize_project(project_directory)
+            applicable_rules = [
+                rule for _, project_filter, rule in candidates
+                if project_filter is None
+                or self._matches_project_filter(project_filter, project_directory, normalized)
+            ]
             
             debug_log(f"🔍 Found {len(applicable_rules)} applicable rules")
             return applicable_rules
@@ -123,26 +258,14 @@ class MessageTypeRulesEngine:
             debug_log(f"❌ Failed to find applicable rules: {e}")
             return []
     
-    def _is_rule_applicable(self, rule: Dict[str, Any], message_type: str, project_directory: str) -> bool:
-        """Check if a rule is applicable to the given context"""
-        # Check if rule is enabled
-        if not rule.get("enabled", True):
-            return False
-        
-        # Check message type match
-        rule_message_type = rule.get("message_type")
-        if rule_message_type and rule_message_type != message_type:
-            return False
-        
-        # Check project filter
-        project_filter = rule.get("project_filter", {})
-        if not self._matches_project_filter(project_filter, project_directory):
-            return False
+    def _matches_project_filter(self, project_filter: Dict[str, Any], project_directory: str,
+                                normalized: Optional[Tuple[str, str, str]] = None) -> bool:
+        """
+        Check if project directory matches the project filter
         
-        return True
-    
-    def _matches_project_filter(self, project_filter: Dict[str, Any], project_directory: str) -> bool:
-        """Check if project directory matches the project filter"""
+        normalized may carry the result of _normalize_project so callers
+        checking many rules only normalize the directory once.
+        """
         filter_type = project_filter.get("type", "all")
         
         if filter_type == "all":
@@ -150,88 +273,197 @@ class MessageTypeRulesEngine:
         
         elif filter_type == "specific":
             patterns = project_filter.get("patterns", [])
-            return self._matches_any_pattern(project_directory, patterns)
+            return self._matches_any_pattern(project_directory, patterns, normalized)
         
         elif filter_type == "exclude":
             patterns = project_filter.get("patterns", [])
-            return not self._matches_any_pattern(project_directory, patterns)
+            return not self._matches_any_pattern(project_directory, patterns, normalized)
         
         elif filter_type == "regex":
-            pattern = project_filter.get("pattern", "")
-            try:
-                return bool(re.search(pattern, project_directory))
-            except re.error:
-                debug_log(f"⚠️ Invalid regex pattern: {pattern}")
-                return False
+            compiled = self._compile_regex(project_filter.get("pattern", ""))
+            return compiled is not None and compiled.search(project_directory) is not None
         
         return False
     
-    def _matches_any_pattern(self, project_directory: str, patterns: List[str]) -> bool:
+    def _matches_any_pattern(self, project_directory: str, patterns: List[str],
+                             normalized: Optional[Tuple[str, str, str]] = None) -> bool:
         """Check if project directory matches any of the given patterns"""
-        project_path = Path(project_directory)
-        project_name = project_path.name
-        project_str = str(project_path)
+        if not patterns:
+            return False
         
-        for pattern in patterns:
-            # Try matching against full path, project name, and normalized path
-            if (fnmatch.fnmatch(project_str, pattern) or
-                fnmatch.fnmatch(project_name, pattern) or
-                fnmatch.fnmatch(project_str.replace("\\", "/"), pattern)):
-                return True
+        if normalized is None:
+            normalized = self._normalize_project(project_directory)
+        project_str, project_name, project_str_fwdslash = normalized
         
-        return False
+        # Try matching against full path, project name, and normalized path
+        compiled = self._compile_patterns(patterns)
+        return bool(compiled.match(project_str) or
+                    compiled.match(project_name) or
+                    compiled.match(project_str_fwdslash))
     
-    def _apply_single_rule(self, rule: Dict[str, Any], config: Dict[str, Any]):
-        """Apply a single rule to the configuration"""
-        rule_type = rule.get("rule_type")
-        rule_value = rule.get("value")
-        
-        if rule_type == "auto_submit_override":
-            config["auto_submit"] = bool(rule_value)
-            # Also apply timeout override if specified
-            if "timeout_override" in rule:
-                config["timeout"] = rule["timeout_override"]
-        
-        elif rule_type == "timeout_override":
-            config["timeout"] = rule_value
-        
-        elif rule_type == "response_header":
-            # Prepend to existing response or create new
-            existing_response = config.get("response_text", "")
-            config["response_text"] = str(rule_value) + existing_response
+    @staticmethod
+    def _normalize_project(project_directory: str) -> Tuple[str, str, str]:
+        """Return the case-normalized (path, name, forward-slash path) used for pattern matching"""
+        project_path = Path(project_directory)
+        project_str = str(project_path)
+        normcase = os.path.normcase
+        return (normcase(project_str),
+                normcase(project_path.name),
+                normcase(project_str.replace("\\", "/")))
+    
+    def _compile_patterns(self, patterns: List[str]) -> "re.Pattern[str]":
+        """
+        Compile a list of glob patterns into one regex
         
-        elif rule_type == "response_footer":
-            # Append to existing response or create new
-            existing_response = config.get("response_text", "")
-            config["response_text"] = existing_response + str(rule_value)
+        Equivalent to fnmatch.fnmatch against each pattern in turn (including
+        its case normalization), but translated and compiled only once.
+        """
+        key = tuple(patterns)
+        compiled = self._pattern_cache.get(key)
+        if compiled is None:
+            compiled = re.compile("|".join(
+                fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns
+            ))
+            self._pattern_cache[key] = compiled
+        return compiled
+    
+    def _compile_regex(self, pattern: str) -> Optional["re.Pattern[str]"]:
+        """Compile a regex project filter once; invalid patterns never match"""
+        try:
+            return self._regex_cache[pattern]
+        except KeyError:
+            pass
         
-        elif rule_type == "template_override":
-            config["template_id"] = rule_value
+        try:
+            compiled = re.compile(pattern)
+        except (re.error, TypeError):
+            debug_log(f"⚠️ Invalid regex pattern: {pattern}")
+            compiled = None
+        self._regex_cache[pattern] = compiled
+        return compiled
+    
+    def _apply_single_rule(self, rule: Dict[str, Any], overrides: Dict[str, Any],
+                           headers: List[str], footers: List[str]):
+        """
+        Record the effect of a single rule
         
-        elif rule_type == "custom_config":
-            # Merge custom configuration
-            if isinstance(rule_value, dict):
-                config.update(rule_value)
+        Overrides are last-writer-wins; header and footer text is collected
+        and joined onto response_text once all rules have been applied.
+        """
+        rule_type = rule.get("rule_type")
+        handler = _RULE_HANDLERS.get(rule_type)
+        if handler is not None:
+            handler(rule, rule.get("value"), overrides, headers, footers)
         
         debug_log(f"📋 Applied rule '{rule.get('id')}' of type '{rule_type}'")
     
     def _get_rules(self) -> Dict[str, Any]:
         """Get rules with caching"""
         try:
-            # Simple cache to avoid repeated file reads
-            current_time = self.storage.rules_file.stat().st_mtime if self.storage.rules_file.exists() else 0
-            
-            if self._rules_cache is None or current_time > self._cache_timestamp:
-                self._rules_cache = self.storage.load_rules()
-                self._cache_timestamp = current_time
-                debug_log("🔄 Rules cache refreshed")
-            
-            return self._rules_cache
+            return self._load_cached_rules()
             
         except Exception as e:
             debug_log(f"❌ Failed to get rules: {e}")
             return {"rules": []}
     
+    def _load_cached_rules(self, check_file: bool = False) -> Dict[str, Any]:
+        """
+        Return the cached rules data, reloading it if the file has changed
+        
+        The file mtime is checked at most once per _stat_interval unless
+        check_file is set. Load errors propagate to the caller.
+        """
+        # Simple cache to avoid repeated file reads
+        now = time.monotonic()
+        if (self._rules_cache is not None and not check_file
+                and now - self._stat_check_at < self._stat_interval):
+            return self._rules_cache
+        self._stat_check_at = now
+        
+        try:
+            current_time = self.storage.rules_file.stat().st_mtime
+        except FileNotFoundError:
+            current_time = 0
+        
+        if self._rules_cache is None or current_time > self._cache_timestamp:
+            self._rules_cache = self.storage.load_rules()
+            self._cache_timestamp = current_time
+            self._pattern_cache.clear()
+            self._regex_cache.clear()
+            debug_log("🔄 Rules cache refreshed")
+        
+        return self._rules_cache
+    
+    def _get_rule_index(self) -> Tuple[Dict[str, List[_IndexedRule]], List[_IndexedRule]]:
+        """Get the message_type buckets for the current rules"""
+        rules_data = self._get_rules()
+        if rules_data is not self._indexed_rules_data:
+            self._build_rule_index(rules_data)
+        return self._rules_by_type, self._wildcard_rules
+    
+    def _get_rules_for_update(self) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Get the current rules data and its rule id -> position map
+        
+        Always re-checks the rules file so mutations start from what is on
+        disk. The returned data is shared with the cache and must not be
+        modified in place.
+        """
+        rules_data = self._load_cached_rules(check_file=True)
+        if rules_data is not self._indexed_rules_data:
+            self._build_rule_index(rules_data)
+        return rules_data, self._rule_ids
+    
+    def _build_rule_index(self, rules_data: Dict[str, Any]):
+        """
+        Bucket enabled rules by message_type; rules without one apply to every type
+        
+        Each entry carries the fields lookups need so find_applicable_rules
+        does not have to go back to the rule dict until a rule matches.
+        Rules are ranked by priority once here, so every bucket is already
+        sorted; project filters that match everything are stored as None.
+        """
+        rules_by_type: Dict[str, List[_IndexedRule]] = {}
+        wildcard_rules: List[_IndexedRule] = []
+        rule_ids: Dict[str, int] = {}
+        
+        rules = rules_data.get("rules", [])
+        for position, rule in enumerate(rules):
+            # First occurrence wins, as with a linear scan
+            rule_ids.setdefault(rule.get("id"), position)
+        
+        enabled_rules = [rule for rule in rules if rule.get("enabled", True)]
+        # Highest priority first; the sort is stable so ties keep file order
+        enabled_rules.sort(key=lambda r: r.get("priority", 0), reverse=True)
+        
+        for rank, rule in enumerate(enabled_rules):
+            project_filter = rule.get("project_filter")
+            if not project_filter or project_filter.get("type", "all") == "all":
+                project_filter = None
+            elif project_filter.get("type") == "regex":
+                # Compile at load so bad patterns are reported once, not per message
+                self._compile_regex(project_filter.get("pattern", ""))
+            entry = (rank, project_filter, rule)
+            
+            # Interned so lookups and handler dispatch hit on identity
+            rule_type = rule.get("rule_type")
+            if type(rule_type) is str:
+                rule["rule_type"] = sys.intern(rule_type)
+            rule_message_type = rule.get("message_type")
+            if rule_message_type:
+                if type(rule_message_type) is str:
+                    rule_message_type = rule["message_type"] = sys.intern(rule_message_type)
+                rules_by_type.setdefault(rule_message_type, []).append(entry)
+            else:
+                wildcard_rules.append(entry)
+        
+        self._rules_by_type = rules_by_type
+        self._wildcard_rules = wildcard_rules
+        self._rule_ids = rule_ids
+        self._indexed_rules_data = rules_data
+        self._index_generation += 1
+        self._apply_cache.clear()
+    
     def add_rule(self, rule: Dict[str, Any]) -> bool:
         """
         Add a new rule
@@ -243,27 +475,25 @@ class MessageTypeRulesEngine:
             True if successful
         """
         try:
-            rules_data = self.storage.load_rules()
+            rules_data, rule_ids = self._get_rules_for_update()
             
             # Validate rule
             self._validate_rule(rule)
             
             # Check for duplicate IDs
-            existing_ids = {r["id"] for r in rules_data["rules"]}
-            if rule["id"] in existing_ids:
+            if rule["id"] in rule_ids:
                 raise ValueError(f"Rule ID '{rule['id']}' already exists")
             
             # Add timestamps
-            from datetime import datetime
             rule["created_at"] = datetime.now().isoformat()
             
-            # Add rule
-            rules_data["rules"].append(rule)
+            # Add rule (copy-on-write, the cached data stays untouched)
+            rules_data = {**rules_data, "rules": rules_data["rules"] + [rule]}
             
             # Save
             success = self.storage.save_rules(rules_data)
             if success:
-                self._invalidate_cache()
+                self._update_cache(rules_data)
                 debug_log(f"➕ Added rule: {rule['id']}")
             
             return success
@@ -284,33 +514,30 @@ class MessageTypeRulesEngine:
             True if successful
         """
         try:
-            rules_data = self.storage.load_rules()
+            rules_data, rule_ids = self._get_rules_for_update()
             
             # Find rule
-            rule_index = None
-            for i, rule in enumerate(rules_data["rules"]):
-                if rule["id"] == rule_id:
-                    rule_index = i
-                    break
-            
+            rule_index = rule_ids.get(rule_id)
             if rule_index is None:
                 raise ValueError(f"Rule '{rule_id}' not found")
             
-            # Update rule
-            rule = rules_data["rules"][rule_index]
-            rule.update(updates)
+            # Update a copy of the rule
+            rule = {**rules_data["rules"][rule_index], **updates}
             
             # Add update timestamp
-            from datetime import datetime
             rule["updated_at"] = datetime.now().isoformat()
             
             # Validate updated rule
             self._validate_rule(rule)
             
+            rules = rules_data["rules"].copy()
+            rules[rule_index] = rule
+            rules_data = {**rules_data, "rules": rules}
+            
             # Save
             success = self.storage.save_rules(rules_data)
             if success:
-                self._invalidate_cache()
+                self._update_cache(rules_data)
                 debug_log(f"✏️ Updated rule: {rule_id}")
             
             return success
@@ -330,19 +557,20 @@ class MessageTypeRulesEngine:
             True if successful
         """
         try:
-            rules_data = self.storage.load_rules()
+            rules_data, rule_ids = self._get_rules_for_update()
             
             # Find and remove rule
-            original_count = len(rules_data["rules"])
-            rules_data["rules"] = [r for r in rules_data["rules"] if r["id"] != rule_id]
-            
-            if len(rules_data["rules"]) == original_count:
+            rule_index = rule_ids.get(rule_id)
+            if rule_index is None:
                 raise ValueError(f"Rule '{rule_id}' not found")
             
+            rules = rules_data["rules"]
+            rules_data = {**rules_data, "rules": rules[:rule_index] + rules[rule_index + 1:]}
+            
             # Save
             success = self.storage.save_rules(rules_data)
             if success:
-                self._invalidate_cache()
+                self._update_cache(rules_data)
                 debug_log(f"🗑️ Deleted rule: {rule_id}")
             
             return success
@@ -360,19 +588,11 @@ class MessageTypeRulesEngine:
                 raise ValueError(f"Rule missing required field: {field}")
         
         # Validate rule types
-        valid_rule_types = [
-            "auto_submit_override", "timeout_override", "response_header", 
-            "response_footer", "template_override", "custom_config"
-        ]
-        if rule["rule_type"] not in valid_rule_types:
+        if rule["rule_type"] not in _VALID_RULE_TYPES:
             raise ValueError(f"Invalid rule_type: {rule['rule_type']}")
         
         # Validate message types
-        valid_message_types = [
-            "general", "code_review", "error_report", "feature_request",
-            "documentation", "testing", "deployment", "security"
-        ]
-        if rule["message_type"] not in valid_message_types:
+        if rule["message_type"] not in _VALID_MESSAGE_TYPES:
             raise ValueError(f"Invalid message_type: {rule['message_type']}")
     
     def _invalidate_cache(self):
@@ -380,42 +600,58 @@ class MessageTypeRulesEngine:
         self._rules_cache = None
         self._cache_timestamp = 0
     
+    def _update_cache(self, rules_data: Dict[str, Any]):
+        """Cache rules data the engine has just saved instead of re-reading it"""
+        try:
+            current_time = self.storage.rules_file.stat().st_mtime
+        except FileNotFoundError:
+            self._invalidate_cache()
+            return
+        
+        self._rules_cache = rules_data
+        self._cache_timestamp = current_time
+        self._stat_check_at = time.monotonic()
+        self._pattern_cache.clear()
+        self._regex_cache.clear()
+    
     def get_rules_summary(self) -> Dict[str, Any]:
         """Get summary of all rules"""
         try:
             rules_data = self._get_rules()
             rules = rules_data.get("rules", [])
             
-            summary = {
+            # Count enabled rules, message types and rule types in one pass
+            enabled_rules = 0
+            by_message_type: Counter = Counter()
+            by_rule_type: Counter = Counter()
+            for rule in rules:
+                if rule.get("enabled", True):
+                    enabled_rules += 1
+                by_message_type[rule.get("message_type", "unknown")] += 1
+                by_rule_type[rule.get("rule_type", "unknown")] += 1
+            
+            return {
                 "total_rules": len(rules),
-                "enabled_rules": len([r for r in rules if r.get("enabled", True)]),
-                "by_message_type": {},
-                "by_rule_type": {},
+                "enabled_rules": enabled_rules,
+                "by_message_type": dict(by_message_type),
+                "by_rule_type": dict(by_rule_type),
                 "storage_info": self.storage.get_storage_info()
             }
             
-            # Count by message type
-            for rule in rules:
-                msg_type = rule.get("message_type", "unknown")
-                summary["by_message_type"][msg_type] = summary["by_message_type"].get(msg_type, 0) + 1
-            
-            # Count by rule type
-            for rule in rules:
-                rule_type = rule.get("rule_type", "unknown")
-                summary["by_rule_type"][rule_type] = summary["by_rule_type"].get(rule_type, 0) + 1
-            
-            return summary
-            
         except Exception as e:
             return {"error": str(e)}
     
-    def test_rule_matching(self, message_type: str, project_directory: str) -> Dict[str, Any]:
+    def test_rule_matching(self, message_type: str, project_directory: str,
+                           include_non_matching: bool = True) -> Dict[str, Any]:
         """
         Test rule matching for debugging
         
         Args:
             message_type: Message type to test
             project_directory: Project directory to test
+            include_non_matching: Also report rules that do not match, with
+                reasons. When False only the applicable rules are looked at
+                and they are listed in priority order.
             
         Returns:
             Test results with matching details
@@ -430,26 +666,34 @@ class MessageTypeRulesEngine:
                 "non_matching_rules": []
             }
             
+            if not include_non_matching:
+                results["matching_rules"] = [
+                    self._rule_info(rule)
+                    for rule in self.find_applicable_rules(message_type, project_directory)
+                ]
+                return results
+            
+            normalized = self._normalize_project(project_directory)
             for rule in rules_data.get("rules", []):
-                rule_info = {
-                    "id": rule.get("id"),
-                    "name": rule.get("name"),
-                    "enabled": rule.get("enabled", True),
-                    "message_type": rule.get("message_type"),
-                    "rule_type": rule.get("rule_type"),
-                    "priority": rule.get("priority", 0)
-                }
+                rule_info = self._rule_info(rule)
+                
+                # Each check evaluated once for both the match and the reasons
+                enabled_ok = rule.get("enabled", True)
+                rule_message_type = rule.get("message_type")
+                message_type_ok = not rule_message_type or rule_message_type == message_type
+                project_ok = self._matches_project_filter(rule.get("project_filter", {}),
+                                                          project_directory, normalized)
                 
-                if self._is_rule_applicable(rule, message_type, project_directory):
+                if enabled_ok and message_type_ok and project_ok:
                     results["matching_rules"].append(rule_info)
                 else:
                     # Add reason for non-match
                     reasons = []
-                    if not rule.get("enabled", True):
+                    if not enabled_ok:
                         reasons.append("disabled")
-                    if rule.get("message_type") != message_type:
+                    if not message_type_ok:
                         reasons.append("message_type_mismatch")
-                    if not self._matches_project_filter(rule.get("project_filter", {}), project_directory):
+                    if not project_ok:
                         reasons.append("project_filter_mismatch")
                     
                     rule_info["non_match_reasons"] = reasons
@@ -459,3 +703,15 @@ class MessageTypeRulesEngine:
             
         except Exception as e:
             return {"error": str(e)}
+    
+    @staticmethod
+    def _rule_info(rule: Dict[str, Any]) -> Dict[str, Any]:
+        """Summary of a rule for test_rule_matching results"""
+        return {
+            "id": rule.get("id"),
+            "name": rule.get("name"),
+            "enabled": rule.get("enabled", True),
+            "message_type": rule.get("message_type"),
+            "rule_type": rule.get("rule_type"),
+            "priority": rule.get("priority", 0)
+        }
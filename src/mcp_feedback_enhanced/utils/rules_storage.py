@@ -7,16 +7,18 @@ Handles persistent storage and retrieval of message type rules.
 Supports JSON-based storage with atomic operations and backup management.
 """
 
-import json
+import asyncio
+import hashlib
 import os
 import shutil
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..debug import debug_log
+from . import json_utils
 from .error_handler import ErrorHandler, ErrorType
 
 
@@ -25,6 +27,13 @@ class RulesStorageError(Exception):
     pass
 
 
+_REQUIRED_FIELDS = ("id", "name", "message_type", "rule_type", "value")
+
+_VALID_RULE_TYPES = frozenset({
+    "auto_submit_override", "response_header", "response_footer", "timeout_override"
+})
+
+
 class RulesStorage:
     """
     Persistent storage manager for message type rules
@@ -46,7 +55,16 @@ class RulesStorage:
         self.storage_dir = Path(storage_dir) if storage_dir else self._get_default_storage_dir()
         self.rules_file = self.storage_dir / "message_type_rules.json"
         self.backup_dir = self.storage_dir / "backups"
-        self.lock = threading.RLock()
+        self.lock = threading.Lock()
+        
+        # Raw bytes of the rules file keyed by (inode, mtime_ns, size)
+        self._cache: Optional[Tuple[Tuple[int, int, int], bytes]] = None
+        
+        # Header fields for get_storage_info, keyed like _cache
+        self._info: Optional[Tuple[Tuple[int, int, int], Dict[str, Any]]] = None
+        
+        # Content digest of the rules file as last saved or read, keyed like _cache
+        self._saved_digest: Optional[Tuple[Tuple[int, int, int], bytes]] = None
         
         # Ensure directories exist
         self._ensure_directories()
@@ -77,9 +95,10 @@ class RulesStorage:
     
     def _create_default_rules(self):
         """Create default rules configuration"""
+        created_at = datetime.now().isoformat()
         default_rules = {
             "version": "1.0",
-            "created_at": datetime.now().isoformat(),
+            "created_at": created_at,
             "rules": [
                 {
                     "id": "error_report_auto_submit",
@@ -94,7 +113,7 @@ class RulesStorage:
                     },
                     "priority": 100,
                     "enabled": True,
-                    "created_at": datetime.now().isoformat()
+                    "created_at": created_at
                 },
                 {
                     "id": "testing_auto_submit",
@@ -109,7 +128,7 @@ class RulesStorage:
                     },
                     "priority": 90,
                     "enabled": True,
-                    "created_at": datetime.now().isoformat()
+                    "created_at": created_at
                 },
                 {
                     "id": "deployment_auto_submit",
@@ -124,7 +143,7 @@ class RulesStorage:
                     },
                     "priority": 95,
                     "enabled": True,
-                    "created_at": datetime.now().isoformat()
+                    "created_at": created_at
                 },
                 {
                     "id": "code_review_header",
@@ -138,7 +157,7 @@ class RulesStorage:
                     },
                     "priority": 50,
                     "enabled": True,
-                    "created_at": datetime.now().isoformat()
+                    "created_at": created_at
                 },
                 {
                     "id": "security_footer",
@@ -152,7 +171,7 @@ class RulesStorage:
                     },
                     "priority": 50,
                     "enabled": True,
-                    "created_at": datetime.now().isoformat()
+                    "created_at": created_at
                 }
             ]
         }
@@ -172,12 +191,19 @@ class RulesStorage:
                 if not self.rules_file.exists():
                     self._create_default_rules()
                 
-                with open(self.rules_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                key, payload = self._read_rules_file()
+                data = json_utils.loads(payload)
                 
                 # Validate and migrate if needed
                 data = self._validate_and_migrate(data)
                 
+                self._info = (key, {
+                    "rules_count": len(data.get("rules", [])),
+                    "version": data.get("version", "unknown"),
+                    "created_at": data.get("created_at"),
+                    "updated_at": data.get("updated_at"),
+                })
+                
                 debug_log(f"📖 Loaded {len(data.get('rules', []))} rules from storage")
                 return data
                 
@@ -188,21 +214,52 @@ class RulesStorage:
                 )
                 raise RulesStorageError(f"Failed to load rules [Error ID: {error_id}]: {e}")
     
-    def save_rules(self, rules_data: Dict[str, Any]) -> bool:
+    def _read_rules_file(self) -> Tuple[Tuple[int, int, int], bytes]:
+        """
+        Read the rules file, reusing the last read while it is unchanged
+        
+        Saves replace the file, so a new inode, mtime or size means new
+        content. Callers still parse into fresh objects on every load.
+        
+        Returns:
+            The file's (inode, mtime_ns, size) key and its contents
+        """
+        key = self._file_key()
+        if self._cache is not None and self._cache[0] == key:
+            return self._cache
+        
+        self._cache = (key, self.rules_file.read_bytes())
+        return self._cache
+    
+    def _file_key(self) -> Tuple[int, int, int]:
+        """Identify the current rules file contents by (inode, mtime_ns, size)"""
+        st = self.rules_file.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def save_rules(self, rules_data: Dict[str, Any], fsync: bool = True) -> bool:
         """
         Save rules to storage with atomic operation
         
         Args:
             rules_data: Complete rules data structure
+            fsync: Flush the file and directory to disk before returning;
+                bulk imports can disable this and rely on a final synced save
             
         Returns:
-            True if successful
+            True if successful. Saving rules identical to what is stored
+            (ignoring updated_at) succeeds without touching the file.
         """
         with self.lock:
             try:
                 # Validate data structure
                 self._validate_rules_data(rules_data)
                 
+                # Skip no-op saves: no backup, no rewrite
+                digest = self._content_digest(rules_data)
+                if self._matches_stored(digest):
+                    debug_log("💾 Rules unchanged, skipping save")
+                    return True
+                
                 # Create backup before saving
                 self._create_backup()
                 
@@ -210,7 +267,8 @@ class RulesStorage:
                 rules_data["updated_at"] = datetime.now().isoformat()
                 
                 # Atomic save
-                self._save_rules_data(rules_data)
+                key = self._save_rules_data(rules_data, fsync=fsync)
+                self._saved_digest = (key, digest)
                 
                 debug_log(f"💾 Saved {len(rules_data.get('rules', []))} rules to storage")
                 return True
@@ -222,16 +280,77 @@ class RulesStorage:
                 )
                 raise RulesStorageError(f"Failed to save rules [Error ID: {error_id}]: {e}")
     
-    def _save_rules_data(self, data: Dict[str, Any]):
-        """Atomic save operation"""
+    async def save_rules_async(self, rules_data: Dict[str, Any], fsync: bool = True) -> bool:
+        """
+        Save rules from async code without blocking the event loop
+        
+        Runs save_rules (including its fsync) in a worker thread; the
+        storage lock still serializes it with other loads and saves.
+        """
+        return await asyncio.to_thread(self.save_rules, rules_data, fsync)
+    
+    @staticmethod
+    def _content_digest(rules_data: Dict[str, Any]) -> bytes:
+        """Digest of rules data, ignoring the updated_at stamp set on every save"""
+        payload = json_utils.dumps_bytes({**rules_data, "updated_at": None})
+        return hashlib.blake2b(payload, digest_size=16).digest()
+    
+    def _matches_stored(self, digest: bytes) -> bool:
+        """Check a content digest against the rules file currently on disk"""
+        try:
+            key = self._file_key()
+        except FileNotFoundError:
+            return False
+        
+        if self._saved_digest is None or self._saved_digest[0] != key:
+            # First save, or the file changed outside this instance
+            try:
+                _, payload = self._read_rules_file()
+                stored = json_utils.loads(payload)
+            except (OSError, ValueError):
+                # Unreadable or corrupt file - let the save replace it
+                return False
+            if not isinstance(stored, dict):
+                return False
+            self._saved_digest = (key, self._content_digest(stored))
+        return self._saved_digest[1] == digest
+    
+    def _save_rules_data(self, data: Dict[str, Any], fsync: bool = True) -> Tuple[int, int, int]:
+        """
+        Atomic save operation
+        
+        The data is written to a temp file in the same directory and renamed
+        over the rules file. With fsync the temp file is flushed before the
+        rename and the directory afterwards, so a crash leaves either the old
+        or the new file - never a truncated one.
+        
+        Returns:
+            The (inode, mtime_ns, size) key of the written file
+        """
         temp_file = self.rules_file.with_suffix('.tmp')
+        payload = json_utils.dumps_bytes(data, indent=True)
         
         try:
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(temp_file, 'wb') as f:
+                f.write(payload)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
             
-            # Atomic move
-            shutil.move(str(temp_file), str(self.rules_file))
+            # A rename keeps inode and mtime, so this is the rules file's key
+            st = temp_file.stat()
+            key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            
+            # Atomic rename (same directory, so never a copy)
+            os.replace(temp_file, self.rules_file)
+            
+            # The next load parses the bytes just written instead of re-reading them
+            self._cache = (key, payload)
+            
+            if fsync:
+                self._fsync_directory()
+            
+            return key
             
         except Exception as e:
             # Clean up temp file if it exists
@@ -239,6 +358,23 @@ class RulesStorage:
                 temp_file.unlink()
             raise e
     
+    def _fsync_directory(self):
+        """Persist the rename of the rules file (not supported on Windows)"""
+        if os.name == 'nt':
+            return
+        
+        try:
+            fd = os.open(self.storage_dir, os.O_RDONLY)
+        except OSError as e:
+            debug_log(f"⚠️ Failed to open storage directory for fsync: {e}")
+            return
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            debug_log(f"⚠️ Failed to fsync storage directory: {e}")
+        finally:
+            os.close(fd)
+    
     def _validate_rules_data(self, data: Dict[str, Any]):
         """Validate rules data structure"""
         if not isinstance(data, dict):
@@ -256,15 +392,12 @@ class RulesStorage:
     
     def _validate_rule(self, rule: Dict[str, Any], index: int):
         """Validate individual rule structure"""
-        required_fields = ["id", "name", "message_type", "rule_type", "value"]
-        
-        for field in required_fields:
+        for field in _REQUIRED_FIELDS:
             if field not in rule:
                 raise ValueError(f"Rule {index} missing required field: {field}")
         
         # Validate rule types
-        valid_rule_types = ["auto_submit_override", "response_header", "response_footer", "timeout_override"]
-        if rule["rule_type"] not in valid_rule_types:
+        if rule["rule_type"] not in _VALID_RULE_TYPES:
             raise ValueError(f"Rule {index} has invalid rule_type: {rule['rule_type']}")
     
     def _validate_and_migrate(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -291,10 +424,16 @@ class RulesStorage:
             return
         
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
             backup_file = self.backup_dir / f"rules_backup_{timestamp}.json"
             
-            shutil.copy2(self.rules_file, backup_file)
+            # Saves replace the rules file rather than rewriting it, so a hard
+            # link keeps the old contents without copying them
+            try:
+                os.link(self.rules_file, backup_file)
+            except OSError:
+                # Existing backup from the same second, cross-device, or no link support
+                shutil.copy2(self.rules_file, backup_file)
             
             # Clean old backups (keep last 10)
             self._cleanup_old_backups()
@@ -307,32 +446,49 @@ class RulesStorage:
     def _cleanup_old_backups(self):
         """Remove old backup files, keeping the most recent 10"""
         try:
-            backup_files = list(self.backup_dir.glob("rules_backup_*.json"))
-            backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+            backup_files = self._list_backups()
             
             # Remove files beyond the 10 most recent
-            for old_backup in backup_files[10:]:
-                old_backup.unlink()
-                debug_log(f"🗑️ Removed old backup: {old_backup.name}")
+            for old_backup in backup_files[:-10]:
+                os.unlink(self.backup_dir / old_backup)
+                debug_log(f"🗑️ Removed old backup: {old_backup}")
                 
         except Exception as e:
             debug_log(f"⚠️ Failed to cleanup old backups: {e}")
     
+    def _list_backups(self) -> List[str]:
+        """
+        List backup file names, oldest first
+        
+        Names embed a %Y%m%d_%H%M%S timestamp, so sorting them lexically
+        orders backups by age without a stat per file.
+        """
+        return sorted(
+            name for name in os.listdir(self.backup_dir)
+            if name.startswith("rules_backup_") and name.endswith(".json")
+        )
+    
     def get_storage_info(self) -> Dict[str, Any]:
         """Get storage information and statistics"""
         try:
-            rules_data = self.load_rules()
-            backup_files = list(self.backup_dir.glob("rules_backup_*.json"))
+            # Header fields come from the last load while the file is unchanged
+            try:
+                key = self._file_key()
+            except FileNotFoundError:
+                key = None
+            info = self._info
+            if key is None or info is None or info[0] != key:
+                self.load_rules()
+                info = self._info
+            file_key, header = info
+            backup_files = self._list_backups()
             
             return {
                 "storage_dir": str(self.storage_dir),
                 "rules_file": str(self.rules_file),
-                "rules_count": len(rules_data.get("rules", [])),
-                "version": rules_data.get("version", "unknown"),
-                "created_at": rules_data.get("created_at"),
-                "updated_at": rules_data.get("updated_at"),
+                **header,
                 "backup_count": len(backup_files),
-                "file_size": self.rules_file.stat().st_size if self.rules_file.exists() else 0
+                "file_size": file_key[2]
             }
         except Exception as e:
             return {"error": str(e)}
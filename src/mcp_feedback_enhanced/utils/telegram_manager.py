@@ -7,8 +7,9 @@ formatting, chunking, and error handling capabilities.
 """
 
 import asyncio
-import json
 import logging
+import math
+import random
 import re
 import time
 from datetime import datetime
@@ -18,6 +19,21 @@ from urllib.parse import quote
 import aiohttp
 
 from ..debug import debug_log
+from . import json_utils
+
+# Characters that need escaping in MarkdownV2, mapped to their escaped form
+_MARKDOWN_V2_ESCAPES = str.maketrans({char: f'\\{char}' for char in '_*[]()~`>#+-=|{}.!'})
+
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_BOT_TOKEN_RE = re.compile(r'^\d+:[A-Za-z0-9_-]+$')
+_USERNAME_CHAT_ID_RE = re.compile(r'^@[A-Za-z0-9_]+$')
+_NUMERIC_CHAT_ID_RE = re.compile(r'^-?\d+$')
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Fixed parts of the MCP tool call message
+_MCP_HEADER = "🤖 **MCP Tool Call**\n\n"
+_MCP_FOOTER = "\n\n---\n💬 Please provide your feedback..."
 
 
 class TelegramRateLimiter:
@@ -27,15 +43,26 @@ class TelegramRateLimiter:
         """
         Initialize rate limiter.
         
+        Uses a token bucket: up to ``max_requests`` calls may burst at once,
+        and tokens refill continuously at ``max_requests / time_window`` per second.
+        
         Args:
             max_requests: Maximum requests per time window (default: 30)
             time_window: Time window in seconds (default: 60)
         """
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests: List[float] = []
+        self.capacity = float(max_requests)
+        self.rate = max_requests / time_window
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
         self._lock = asyncio.Lock()
     
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last refill."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+    
     async def acquire(self) -> bool:
         """
         Acquire permission to make an API call.
@@ -44,19 +71,33 @@ class TelegramRateLimiter:
             True if request is allowed, False if rate limited
         """
         async with self._lock:
-            now = time.time()
+            self._refill(time.monotonic())
             
-            # Remove old requests outside the time window
-            self.requests = [req_time for req_time in self.requests 
-                           if now - req_time < self.time_window]
-            
-            # Check if we can make a new request
-            if len(self.requests) < self.max_requests:
-                self.requests.append(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
                 return True
             
             return False
     
+    async def wait(self) -> None:
+        """
+        Wait until a request slot is available and take it.
+        
+        Waiters queue on the lock and are released one at a time as tokens
+        refill, so a burst of concurrent senders is paced instead of waking
+        together and racing for the same token.
+        """
+        async with self._lock:
+            while True:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                delay = (1 - self.tokens) / self.rate
+                debug_log(f"Rate limited, waiting {delay:.2f} seconds")
+                await asyncio.sleep(delay)
+    
     def get_retry_after(self) -> int:
         """
         Calculate retry delay for rate limited requests.
@@ -64,11 +105,11 @@ class TelegramRateLimiter:
         Returns:
             Seconds to wait before next request
         """
-        if not self.requests:
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
             return 0
         
-        oldest_request = min(self.requests)
-        return max(0, int(self.time_window - (time.time() - oldest_request)))
+        return math.ceil((1 - self.tokens) / self.rate)
 
 
 class TelegramMessageChunker:
@@ -112,49 +153,62 @@ class TelegramMessageChunker:
     
     def _chunk_with_formatting(self, text: str) -> List[str]:
         """Chunk text while preserving markdown formatting."""
+        max_length = self.max_length
         chunks = []
-        current_chunk = ""
+        # Pieces of the chunk being built and its joined length, so each
+        # piece is copied once instead of on every concatenation
+        parts: List[str] = []
+        length = 0
         
         # Split by paragraphs first
-        paragraphs = text.split('\n\n')
-        
-        for paragraph in paragraphs:
+        for paragraph in text.split('\n\n'):
             # Check if adding this paragraph would exceed limit
-            test_chunk = current_chunk + ('\n\n' if current_chunk else '') + paragraph
+            added = len(paragraph) + (2 if length else 0)
+            
+            if length + added <= max_length:
+                if length:
+                    parts.append('\n\n')
+                parts.append(paragraph)
+                length += added
+                continue
             
-            if len(test_chunk) <= self.max_length:
-                current_chunk = test_chunk
+            # Save current chunk if not empty
+            if length:
+                chunks.append(''.join(parts))
+            parts = []
+            length = 0
+            
+            # Handle large paragraphs
+            if len(paragraph) > max_length:
+                # Split large paragraph by sentences
+                for sentence in _SENTENCE_SPLIT_RE.split(paragraph):
+                    added = len(sentence) + (1 if length else 0)
+                    
+                    if length + added <= max_length:
+                        if length:
+                            parts.append(' ')
+                        parts.append(sentence)
+                        length += added
+                        continue
+                    
+                    if length:
+                        chunks.append(''.join(parts))
+                    
+                    # Handle very long sentences
+                    if len(sentence) > max_length:
+                        chunks.extend(self._chunk_simple(sentence))
+                        parts = []
+                        length = 0
+                    else:
+                        parts = [sentence]
+                        length = len(sentence)
             else:
-                # Save current chunk if not empty
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
-                
-                # Handle large paragraphs
-                if len(paragraph) > self.max_length:
-                    # Split large paragraph by sentences
-                    sentences = re.split(r'(?<=[.!?])\s+', paragraph)
-                    for sentence in sentences:
-                        test_chunk = current_chunk + (' ' if current_chunk else '') + sentence
-                        
-                        if len(test_chunk) <= self.max_length:
-                            current_chunk = test_chunk
-                        else:
-                            if current_chunk:
-                                chunks.append(current_chunk)
-                            
-                            # Handle very long sentences
-                            if len(sentence) > self.max_length:
-                                chunks.extend(self._chunk_simple(sentence))
-                                current_chunk = ""
-                            else:
-                                current_chunk = sentence
-                else:
-                    current_chunk = paragraph
+                parts = [paragraph]
+                length = len(paragraph)
         
         # Add remaining chunk
-        if current_chunk:
-            chunks.append(current_chunk)
+        if length:
+            chunks.append(''.join(parts))
         
         return chunks
     
@@ -210,32 +264,38 @@ class TelegramMessageChunker:
             return [f"{code_prefix}{code}{code_suffix}"]
         
         chunks = []
-        lines = code.split('\n')
-        current_chunk = ""
+        parts: List[str] = []
+        length = 0
         
-        for line in lines:
-            test_chunk = current_chunk + ('\n' if current_chunk else '') + line
+        for line in code.split('\n'):
+            added = len(line) + (1 if length else 0)
+            
+            if length + added <= available_length:
+                if length:
+                    parts.append('\n')
+                parts.append(line)
+                length += added
+                continue
             
-            if len(test_chunk) <= available_length:
-                current_chunk = test_chunk
+            # Save current chunk
+            if length:
+                chunks.append(f"{code_prefix}{''.join(parts)}{code_suffix}")
+            parts = []
+            length = 0
+            
+            # Handle very long lines
+            if len(line) > available_length:
+                # Split long line
+                for i in range(0, len(line), available_length):
+                    line_chunk = line[i:i + available_length]
+                    chunks.append(f"{code_prefix}{line_chunk}{code_suffix}")
             else:
-                # Save current chunk
-                if current_chunk:
-                    chunks.append(f"{code_prefix}{current_chunk}{code_suffix}")
-                    current_chunk = ""
-                
-                # Handle very long lines
-                if len(line) > available_length:
-                    # Split long line
-                    for i in range(0, len(line), available_length):
-                        line_chunk = line[i:i + available_length]
-                        chunks.append(f"{code_prefix}{line_chunk}{code_suffix}")
-                else:
-                    current_chunk = line
+                parts = [line]
+                length = len(line)
         
         # Add remaining chunk
-        if current_chunk:
-            chunks.append(f"{code_prefix}{current_chunk}{code_suffix}")
+        if length:
+            chunks.append(f"{code_prefix}{''.join(parts)}{code_suffix}")
         
         return chunks
 
@@ -248,7 +308,13 @@ class TelegramBotManager:
     with proper rate limiting and Telegram API compliance.
     """
     
-    def __init__(self, bot_token: str, chat_id: str, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        bot_token: str,
+        chat_id: str,
+        config: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         """
         Initialize Telegram Bot Manager.
         
@@ -256,6 +322,7 @@ class TelegramBotManager:
             bot_token: Telegram Bot API token
             chat_id: Target chat ID for messages
             config: Optional configuration dictionary
+            session: Optional existing HTTP session to reuse; it is not closed by stop()
         """
         self.bot_token = bot_token
         self.chat_id = str(chat_id)
@@ -275,6 +342,7 @@ class TelegramBotManager:
         
         # HTTP session
         self.session: Optional[aiohttp.ClientSession] = None
+        self._shared_session = session
         
         # State tracking
         self.last_update_id = 0
@@ -295,8 +363,9 @@ class TelegramBotManager:
     async def start(self):
         """Initialize the bot manager."""
         if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            self.session = self._shared_session or _create_session(
+                self.config.get('connection_pool_size', 20)
+            )
         
         debug_log(f"TelegramBotManager started for chat {self.chat_id}")
     
@@ -305,11 +374,18 @@ class TelegramBotManager:
         self.is_polling = False
         
         if self.session:
-            await self.session.close()
+            # A session passed in by the caller is theirs to close
+            if self.session is not self._shared_session:
+                await self.session.close()
             self.session = None
         
         debug_log("TelegramBotManager stopped")
     
+    @staticmethod
+    async def _read_json(response: aiohttp.ClientResponse) -> Dict[str, Any]:
+        """Decode a Telegram API response body."""
+        return json_utils.loads(await response.read())
+    
     async def send_message(
         self, 
         text: str, 
@@ -329,11 +405,7 @@ class TelegramBotManager:
         Returns:
             Telegram API response or None if failed
         """
-        if not await self.rate_limiter.acquire():
-            retry_after = self.rate_limiter.get_retry_after()
-            debug_log(f"Rate limited, waiting {retry_after} seconds")
-            await asyncio.sleep(retry_after)
-            return await self.send_message(text, parse_mode, disable_web_page_preview, reply_to_message_id)
+        await self.rate_limiter.wait()
         
         url = f"{self.api_base_url}/sendMessage"
         
@@ -350,8 +422,10 @@ class TelegramBotManager:
             payload["reply_to_message_id"] = reply_to_message_id
         
         try:
-            async with self.session.post(url, json=payload) as response:
-                result = await response.json()
+            async with self.session.post(
+                url, data=json_utils.dumps_bytes(payload), headers=_JSON_HEADERS
+            ) as response:
+                result = await self._read_json(response)
                 
                 if response.status == 200 and result.get("ok"):
                     debug_log(f"Message sent successfully: {result['result']['message_id']}")
@@ -385,11 +459,9 @@ class TelegramBotManager:
         chunks = self.message_chunker.chunk_message(text, preserve_formatting)
         results = []
         
-        for i, chunk in enumerate(chunks):
-            # Add small delay between chunks to avoid rate limiting
-            if i > 0:
-                await asyncio.sleep(0.5)
-            
+        # Sent one after another so the parts arrive in order; the rate
+        # limiter in send_message does the pacing
+        for chunk in chunks:
             result = await self.send_message(chunk, parse_mode)
             results.append(result)
         
@@ -422,10 +494,7 @@ class TelegramBotManager:
         # Send code in chunks
         code_chunks = self.message_chunker.chunk_code_block(code, language)
         
-        for i, chunk in enumerate(code_chunks):
-            if i > 0 or caption:  # Add delay if not first message
-                await asyncio.sleep(0.5)
-            
+        for chunk in code_chunks:
             result = await self.send_message(chunk, parse_mode=None)  # No parse mode for code blocks
             results.append(result)
         
@@ -448,10 +517,7 @@ class TelegramBotManager:
         Returns:
             Telegram API response or None if failed
         """
-        if not await self.rate_limiter.acquire():
-            retry_after = self.rate_limiter.get_retry_after()
-            await asyncio.sleep(retry_after)
-            return await self.send_file(file_path, caption, parse_mode)
+        await self.rate_limiter.wait()
         
         url = f"{self.api_base_url}/sendDocument"
         
@@ -467,7 +533,7 @@ class TelegramBotManager:
                         data.add_field('parse_mode', parse_mode)
                 
                 async with self.session.post(url, data=data) as response:
-                    result = await response.json()
+                    result = await self._read_json(response)
                     
                     if response.status == 200 and result.get("ok"):
                         debug_log(f"File sent successfully: {result['result']['message_id']}")
@@ -502,12 +568,21 @@ class TelegramBotManager:
         if offset is not None:
             params["offset"] = offset
         
+        # Allow the long poll to outlast the session-wide request timeout
+        request_timeout = aiohttp.ClientTimeout(total=timeout + 10)
+        
         try:
-            async with self.session.get(url, params=params) as response:
-                result = await response.json()
+            async with self.session.get(url, params=params, timeout=request_timeout) as response:
+                result = await self._read_json(response)
                 
                 if response.status == 200 and result.get("ok"):
                     return result.get("result", [])
+                elif response.status == 429:
+                    # Honor Telegram's flood control, with jitter to avoid lockstep retries
+                    retry_after = result.get("parameters", {}).get("retry_after", 1)
+                    debug_log(f"getUpdates rate limited, retrying after {retry_after}s")
+                    await asyncio.sleep(retry_after + random.uniform(0, 1))  # noqa: S311
+                    return []
                 else:
                     error_msg = result.get("description", "Unknown error")
                     debug_log(f"Failed to get updates: {error_msg}")
@@ -529,7 +604,7 @@ class TelegramBotManager:
             url = f"{self.api_base_url}/getMe"
             
             async with self.session.get(url) as response:
-                result = await response.json()
+                result = await self._read_json(response)
                 
                 if not (response.status == 200 and result.get("ok")):
                     error_msg = result.get("description", "Invalid bot token")
@@ -560,9 +635,12 @@ class TelegramBotManager:
         """
         self.is_polling = True
         debug_log("Started Telegram polling")
+        backoff = 1
         
         while self.is_polling:
             try:
+                # Long-poll Telegram; the request itself blocks until updates arrive
+                poll_started = time.monotonic()
                 updates = await self.get_updates(offset=self.last_update_id + 1)
                 
                 for update in updates:
@@ -574,12 +652,18 @@ class TelegramBotManager:
                         except Exception as e:
                             debug_log(f"Error in message handler: {e}")
                 
-                # Small delay to prevent excessive API calls
-                await asyncio.sleep(1)
+                # Poll again right away unless an empty result came back early,
+                # which means the request failed
+                if updates or time.monotonic() - poll_started >= 1:
+                    backoff = 1
+                    continue
                 
             except Exception as e:
                 debug_log(f"Error in polling loop: {e}")
-                await asyncio.sleep(5)  # Wait longer on error
+            
+            # Back off exponentially while polling keeps failing
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
     
     def stop_polling(self):
         """Stop the polling loop."""
@@ -611,21 +695,13 @@ class TelegramBotManager:
         Returns:
             Formatted message string
         """
-        lines = []
-        
-        # Header
-        lines.append("🤖 **MCP Tool Call**")
-        lines.append("")
-        
-        # Tool information
-        lines.append(f"**Tool:** `{tool_name}`")
+        parts = [f"{_MCP_HEADER}**Tool:** `{tool_name}`"]
         
         if include_timestamp:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            lines.append(f"**Time:** {timestamp}")
+            parts.append(f"\n**Time:** {datetime.now().isoformat(' ', 'seconds')}")
         
         if include_session_id and session_id:
-            lines.append(f"**Session:** `{session_id[:8]}...`")
+            parts.append(f"\n**Session:** `{session_id[:8]}...`")
         
         if include_project_path and project_directory:
             # Truncate long paths
@@ -633,19 +709,11 @@ class TelegramBotManager:
                 path_display = "..." + project_directory[-47:]
             else:
                 path_display = project_directory
-            lines.append(f"**Project:** `{path_display}`")
+            parts.append(f"\n**Project:** `{path_display}`")
         
-        lines.append("")
+        parts.append(f"\n\n**Summary:**\n{summary}{_MCP_FOOTER}")
         
-        # Summary
-        lines.append("**Summary:**")
-        lines.append(summary)
-        
-        lines.append("")
-        lines.append("---")
-        lines.append("💬 Please provide your feedback...")
-        
-        return "\n".join(lines)
+        return "".join(parts)
     
     @staticmethod
     def escape_markdown_v2(text: str) -> str:
@@ -658,13 +726,7 @@ class TelegramBotManager:
         Returns:
             Escaped text
         """
-        # Characters that need escaping in MarkdownV2
-        special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        
-        for char in special_chars:
-            text = text.replace(char, f'\\{char}')
-        
-        return text
+        return text.translate(_MARKDOWN_V2_ESCAPES)
     
     @staticmethod
     def validate_bot_token(token: str) -> bool:
@@ -679,8 +741,7 @@ class TelegramBotManager:
         """
         # Telegram bot token format: <bot_id>:<bot_secret>
         # bot_id is numeric, bot_secret is alphanumeric with underscores and hyphens
-        pattern = r'^\d+:[A-Za-z0-9_-]+$'
-        return bool(re.match(pattern, token))
+        return bool(_BOT_TOKEN_RE.match(token))
     
     @staticmethod
     def validate_chat_id(chat_id: str) -> bool:
@@ -696,13 +757,78 @@ class TelegramBotManager:
         # Chat ID can be numeric (positive or negative) or username starting with @
         if chat_id.startswith('@'):
             # Username format: @username (alphanumeric and underscores)
-            return bool(re.match(r'^@[A-Za-z0-9_]+$', chat_id))
+            return bool(_USERNAME_CHAT_ID_RE.match(chat_id))
         else:
             # Numeric chat ID (can be negative for groups)
-            return bool(re.match(r'^-?\d+$', chat_id))
+            return bool(_NUMERIC_CHAT_ID_RE.match(chat_id))
 
 
 # Convenience functions for easy usage
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _create_session(pool_size: int = 20) -> aiohttp.ClientSession:
+    """Create an HTTP session tuned for talking to the Telegram API."""
+    timeout = aiohttp.ClientTimeout(total=30)
+    # All traffic goes to api.telegram.org, so keep a per-host pool of
+    # warm TLS connections and cache its DNS lookup between requests
+    connector = aiohttp.TCPConnector(
+        limit=pool_size,
+        limit_per_host=pool_size,
+        ttl_dns_cache=300,
+        keepalive_timeout=75
+    )
+    return aiohttp.ClientSession(timeout=timeout, connector=connector)
+
+
+async def _get_shared_session() -> aiohttp.ClientSession:
+    """
+    Return the session shared by the convenience functions.
+    
+    Created lazily and recreated if it was closed or belongs to a different
+    event loop, since aiohttp sessions cannot be used across loops.
+    """
+    global _shared_session, _shared_session_loop
+    
+    loop = asyncio.get_running_loop()
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        if _shared_session is not None and not _shared_session.closed:
+            _release_foreign_session(_shared_session, _shared_session_loop)
+        _shared_session = _create_session()
+        _shared_session_loop = loop
+    
+    return _shared_session
+
+
+def _release_foreign_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop) -> None:
+    """Close a session that belongs to an event loop other than the running one."""
+    if loop.is_running():
+        # Still serving another thread; close it there
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+    else:
+        # Its loop has stopped and cannot run the close; detach the connector
+        # so the abandoned session is not reported as unclosed
+        debug_log("Dropping shared Telegram session from a stopped event loop")
+        session.detach()
+
+
+async def close_shared_session() -> None:
+    """Close the session shared by the convenience functions, if any."""
+    global _shared_session, _shared_session_loop
+    
+    session, loop = _shared_session, _shared_session_loop
+    _shared_session = None
+    _shared_session_loop = None
+    
+    if session is None or session.closed:
+        return
+    if loop is asyncio.get_running_loop():
+        await session.close()
+    else:
+        _release_foreign_session(session, loop)
+
+
 async def send_telegram_message(
     bot_token: str, 
     chat_id: str, 
@@ -721,7 +847,8 @@ async def send_telegram_message(
     Returns:
         Telegram API response or None
     """
-    async with TelegramBotManager(bot_token, chat_id) as bot:
+    session = await _get_shared_session()
+    async with TelegramBotManager(bot_token, chat_id, session=session) as bot:
         return await bot.send_message(message, **kwargs)
 
 
@@ -736,5 +863,6 @@ async def test_telegram_connection(bot_token: str, chat_id: str) -> Tuple[bool,
     Returns:
         Tuple of (success, message)
     """
-    async with TelegramBotManager(bot_token, chat_id) as bot:
-        return await bot.test_connection()
\ No newline at end of file
+    session = await _get_shared_session()
+    async with TelegramBotManager(bot_token, chat_id, session=session) as bot:
+        return await bot.test_connection()
@@ -72,6 +72,21 @@ class TestUtils:
             },
         }
 
+    @staticmethod
+    def create_test_rule(rule_id: str, **overrides: Any) -> dict[str, Any]:
+        """創建測試訊息類型規則"""
+        rule = {
+            "id": rule_id,
+            "name": rule_id,
+            "message_type": "general",
+            "rule_type": "timeout_override",
+            "value": 60,
+            "priority": 0,
+            "enabled": True,
+        }
+        rule.update(overrides)
+        return rule
+
     @staticmethod
     def validate_web_response(response_data: dict[str, Any]) -> bool:
         """驗證 Web 回應格式"""
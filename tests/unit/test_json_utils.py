@@ -0,0 +1,62 @@
+"""
+JSON helper tests
+
+Checks that json_utils produces the same output with and without orjson.
+"""
+
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from mcp_feedback_enhanced.utils import json_utils
+
+
+SAMPLE = {"name": "回饋", "items": [1, 2.5, None, True], "nested": {"a": "b"}}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request):
+    if request.param == "orjson":
+        if not json_utils.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+        yield
+    else:
+        with patch.object(json_utils, "orjson", None):
+            yield
+
+
+class TestJsonUtils:
+    """Round-trip and formatting behaviour"""
+
+    def test_round_trip(self, backend):
+        assert json_utils.loads(json_utils.dumps(SAMPLE)) == SAMPLE
+        assert json_utils.loads(json_utils.dumps_bytes(SAMPLE)) == SAMPLE
+
+    def test_indent_matches_stdlib(self, backend):
+        expected = json.dumps(SAMPLE, ensure_ascii=False, indent=2)
+        assert json_utils.dumps(SAMPLE, indent=True) == expected
+
+    def test_compact_output_keeps_unicode(self, backend):
+        assert json_utils.dumps({"k": "回饋"}) == '{"k":"回饋"}'
+
+    def test_invalid_input_raises_value_error(self, backend):
+        with pytest.raises(ValueError):
+            json_utils.loads("{not json")
+
+
+@pytest.mark.skipif(not json_utils.HAS_ORJSON, reason="orjson not installed")
+class TestOrjsonDifferences:
+    """Documented differences from the standard library with orjson"""
+
+    def test_non_finite_floats(self):
+        assert json_utils.dumps([float("nan"), float("inf")]) == "[null,null]"
+        with pytest.raises(ValueError):
+            json_utils.loads("NaN")
+
+    def test_datetime_serialized(self):
+        assert json_utils.dumps(datetime(2024, 1, 2, 3, 4, 5)) == '"2024-01-02T03:04:05"'
+
+    def test_non_str_keys_and_big_ints(self):
+        assert json_utils.dumps({1: True, None: 2**70}) == '{"1":true,"null":1180591620717411303424}'
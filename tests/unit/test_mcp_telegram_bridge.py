@@ -0,0 +1,460 @@
+"""
+MCP-Telegram bridge tests
+
+Covers session bookkeeping and Telegram response routing in
+MCPTelegramBridge using a stubbed Telegram manager.
+"""
+
+import asyncio
+import dataclasses
+import json
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mcp_feedback_enhanced.utils import mcp_telegram_bridge as bridge_module
+from mcp_feedback_enhanced.utils.logging_middleware import (
+    MCPEventType,
+    MCPLogEntry,
+    MCPLoggingMiddleware,
+)
+from mcp_feedback_enhanced.utils.mcp_telegram_bridge import (
+    BridgeMessage,
+    BridgeStatus,
+    CorrelationCache,
+    MCPTelegramBridge,
+    MessageType,
+    get_bridge,
+    initialize_bridge,
+    use_bridge,
+)
+
+
+class FakeTelegramManager:
+    """Minimal TelegramBotManager stand-in that records sent messages"""
+
+    def __init__(self):
+        self.sent = []
+        self._next_id = 100
+
+    async def send_message(self, text, parse_mode=None, **kwargs):
+        self._next_id += 1
+        self.sent.append(text)
+        return {"message_id": self._next_id}
+
+
+@pytest.fixture
+def bridge():
+    return MCPTelegramBridge(FakeTelegramManager(), MCPLoggingMiddleware())
+
+
+class TestSessionRouting:
+    """Session lookup by chat id"""
+
+    @pytest.mark.asyncio
+    async def test_response_routed_to_session_by_chat(self, bridge):
+        await bridge.create_session("s1", "111", "/tmp/a")
+        await bridge.create_session("s2", "222", "/tmp/b")
+
+        handled = await bridge.handle_telegram_response(
+            {"chat": {"id": 222}, "text": "hello", "message_id": 5}
+        )
+
+        assert handled
+        assert bridge.get_pending_feedback("s2")["interactive_feedback"] == "hello"
+        assert bridge.get_pending_feedback("s1") is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_chat_is_ignored(self, bridge):
+        await bridge.create_session("s1", "111", "/tmp/a")
+
+        handled = await bridge.handle_telegram_response(
+            {"chat": {"id": 999}, "text": "hello"}
+        )
+
+        assert not handled
+
+    @pytest.mark.asyncio
+    async def test_end_session_clears_chat_index(self, bridge):
+        await bridge.create_session("s1", "111", "/tmp/a")
+        await bridge.end_session("s1")
+
+        assert "111" not in bridge.chat_to_session
+        assert not await bridge.handle_telegram_response(
+            {"chat": {"id": 111}, "text": "late"}
+        )
+
+    @pytest.mark.asyncio
+    async def test_end_session_falls_back_to_other_session_on_chat(self, bridge):
+        await bridge.create_session("s1", "111", "/tmp/a")
+        await bridge.create_session("s2", "111", "/tmp/b")
+        await bridge.end_session("s2")
+
+        assert bridge.chat_to_session["111"] == "s1"
+
+
+    @pytest.mark.asyncio
+    async def test_reply_goes_to_oldest_session_on_shared_chat(self, bridge):
+        for session_id in ("s1", "s2", "s3"):
+            await bridge.create_session(session_id, "111", "/tmp/a")
+
+        await bridge.handle_telegram_response({"chat": {"id": 111}, "text": "first"})
+        assert bridge.get_pending_feedback("s1")["interactive_feedback"] == "first"
+        assert bridge.get_pending_feedback("s3") is None
+
+        await bridge.end_session("s1")
+        await bridge.handle_telegram_response({"chat": {"id": 111}, "text": "second"})
+
+        assert bridge.get_pending_feedback("s2")["interactive_feedback"] == "second"
+        assert bridge.get_pending_feedback("s3") is None
+        assert bridge.chat_to_session["111"] == "s2"
+
+
+class TestCorrelationCache:
+    """Bounded TTL mapping for message correlations"""
+
+    def test_evicts_oldest_beyond_maxsize(self):
+        cache = CorrelationCache(maxsize=2, ttl_seconds=60)
+        cache["1"] = "a"
+        cache["2"] = "b"
+        cache["3"] = "c"
+
+        assert len(cache) == 2
+        assert cache.get("1") is None
+        assert cache.get("3") == "c"
+
+    def test_entries_expire_after_ttl(self):
+        cache = CorrelationCache(maxsize=10, ttl_seconds=60)
+        with patch("time.monotonic", return_value=1000.0):
+            cache["1"] = "a"
+        with patch("time.monotonic", return_value=1061.0):
+            assert cache.get("1") is None
+            assert len(cache) == 0
+
+
+class TestChunkedSend:
+    """Sending chunked MCP messages"""
+
+    @pytest.mark.asyncio
+    async def test_chunk_ids_returned_in_order(self, bridge):
+        bridge.message_chunker.max_chunk_size = 200
+        await bridge.create_session("s1", "111", "/tmp/a")
+
+        message = "\n\n".join(f"Paragraph {i} " + "x" * 150 for i in range(5))
+        msg_ids = await bridge.send_mcp_message_to_telegram("s1", "call", message)
+
+        assert msg_ids == sorted(msg_ids)
+        assert len(msg_ids) == len(bridge.telegram_manager.sent)
+        assert bridge.message_correlation.get(str(msg_ids[0])) == "call_chunk_0"
+
+
+    @pytest.mark.asyncio
+    async def test_chunks_sent_one_at_a_time(self, bridge):
+        bridge.message_chunker.max_chunk_size = 200
+        await bridge.create_session("s1", "111", "/tmp/a")
+        in_flight = []
+        overlaps = []
+        send = bridge.telegram_manager.send_message
+
+        async def slow_send(text, parse_mode=None, **kwargs):
+            overlaps.append(len(in_flight))
+            in_flight.append(text)
+            await asyncio.sleep(0.01 if len(overlaps) == 1 else 0)
+            in_flight.remove(text)
+            return await send(text, parse_mode)
+
+        bridge.telegram_manager.send_message = slow_send
+        message = "\n\n".join(f"Paragraph {i} " + "x" * 150 for i in range(5))
+        await bridge.send_mcp_message_to_telegram("s1", "call", message)
+
+        assert len(overlaps) > 1
+        assert not any(overlaps)
+        joined = "".join(bridge.telegram_manager.sent)
+        positions = [joined.index(f"Paragraph {i}") for i in range(5)]
+        assert positions == sorted(positions)
+
+    @pytest.mark.asyncio
+    async def test_remaining_chunks_skipped_after_failure(self, bridge):
+        bridge.message_chunker.max_chunk_size = 200
+        await bridge.create_session("s1", "111", "/tmp/a")
+        attempts = []
+
+        async def failing_second(text, parse_mode=None, **kwargs):
+            attempts.append(text)
+            return None if len(attempts) == 2 else {"message_id": len(attempts)}
+
+        bridge.telegram_manager.send_message = failing_second
+        message = "\n\n".join(f"Paragraph {i} " + "x" * 150 for i in range(5))
+        msg_ids = await bridge.send_mcp_message_to_telegram("s1", "call", message)
+
+        assert msg_ids == [1]
+        assert len(attempts) == 2
+
+
+class TestSessionExpiry:
+    """Monotonic activity tracking on TelegramSession"""
+
+    @pytest.mark.asyncio
+    async def test_session_expires_after_timeout(self, bridge):
+        await bridge.create_session("s1", "111", "/tmp/a")
+        session = bridge.active_sessions["s1"]
+
+        now = session.last_activity_mono
+        assert not session.is_expired(30, now + 29 * 60)
+        assert session.is_expired(30, now + 31 * 60)
+
+        with patch("time.monotonic", return_value=now + 31 * 60):
+            session.update_activity()
+        assert not session.is_expired(30, now + 31 * 60)
+
+
+class FakeWebSocket:
+    """WebSocket stand-in with configurable send behaviour"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.received = []
+
+    async def send_text(self, text):
+        if self.fail:
+            raise ConnectionError("closed")
+        await asyncio.sleep(self.delay)
+        self.received.append(text)
+
+
+class TestWebSocketBroadcast:
+    """Live update fan-out to WebSocket clients"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_drops_failed_and_stuck_clients(self, bridge):
+        bridge.websocket_send_timeout = 0.05
+        healthy = FakeWebSocket()
+        broken = FakeWebSocket(fail=True)
+        stuck = FakeWebSocket(delay=1.0)
+        for websocket in (healthy, broken, stuck):
+            bridge.add_websocket_connection(websocket)
+
+        await bridge._broadcast_websocket_update({"type": "ping"})
+
+        assert json.loads(healthy.received[0]) == {"type": "ping"}
+        assert bridge.websocket_connections == {healthy}
+
+    @pytest.mark.asyncio
+    async def test_updates_queued_only_with_clients(self, bridge):
+        bridge._send_websocket_update({"type": "ignored"})
+        assert bridge._ws_queue.empty()
+
+        bridge.add_websocket_connection(FakeWebSocket())
+        bridge._send_websocket_update({"type": "queued"})
+        assert bridge._ws_queue.get_nowait() == {"type": "queued"}
+
+
+class TestBridgeMessage:
+    """BridgeMessage serialization"""
+
+    def test_to_dict_round_trip(self):
+        message = BridgeMessage(
+            id="m1",
+            message_type=MessageType.TELEGRAM_TO_MCP,
+            timestamp="2024-01-01T00:00:00",
+            session_id="s1",
+            content="hi",
+            metadata={"k": "v"},
+            telegram_message_id=7,
+        )
+
+        data = message.to_dict()
+
+        assert data["message_type"] == "telegram_to_mcp"
+        assert set(data) == {f.name for f in dataclasses.fields(BridgeMessage)}
+        assert BridgeMessage.from_dict(dict(data)) == message
+
+    def test_bridge_message_is_immutable(self):
+        message = BridgeMessage(
+            id="m1", message_type=MessageType.SESSION_UPDATE, timestamp="t"
+        )
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            message.content = "changed"
+
+
+class TestMessageHandlers:
+    """Registered message handler dispatch"""
+
+    @pytest.mark.asyncio
+    async def test_sync_and_async_handlers_receive_message(self, bridge):
+        received = []
+
+        async def async_handler(message):
+            received.append(("async", message.id))
+
+        def failing_handler(message):
+            raise RuntimeError("boom")
+
+        bridge.add_message_handler(MessageType.SESSION_UPDATE, failing_handler)
+        bridge.add_message_handler(MessageType.SESSION_UPDATE, async_handler)
+        bridge.add_message_handler(
+            MessageType.SESSION_UPDATE, lambda m: received.append(("sync", m.id))
+        )
+
+        await bridge._notify_message_handlers(
+            BridgeMessage(id="m1", message_type=MessageType.SESSION_UPDATE, timestamp="t")
+        )
+
+        assert received == [("async", "m1"), ("sync", "m1")]
+
+
+class TestChatDispatch:
+    """Per-chat queueing of inbound Telegram messages"""
+
+    @pytest.mark.asyncio
+    async def test_messages_handled_in_order_per_chat(self, bridge):
+        bridge.chat_worker_idle_timeout = 0.01
+        handled = []
+
+        async def fake_handle(message):
+            await asyncio.sleep(0.01 if message["text"] == "a1" else 0)
+            handled.append(message["text"])
+
+        bridge.handle_telegram_response = fake_handle
+        for chat, text in (("1", "a1"), ("2", "b1"), ("1", "a2")):
+            bridge._dispatch_telegram_message({"chat": {"id": chat}, "text": text})
+
+        await asyncio.gather(*bridge._chat_workers.values())
+
+        assert handled.index("a1") < handled.index("a2")
+        assert handled[0] == "b1"
+        assert not bridge._chat_workers
+        assert not bridge._chat_queues
+
+
+class TestTelegramPolling:
+    """Long-poll loop offset handling"""
+
+    @pytest.mark.asyncio
+    async def test_offset_advances_past_seen_updates(self, bridge):
+        calls = []
+
+        async def fake_get_updates(offset=None, timeout=30):
+            calls.append(offset)
+            if len(calls) == 1:
+                return [
+                    {"update_id": 10, "message": {"chat": {"id": 1}, "text": "x"}},
+                    {"update_id": 11},
+                ]
+            bridge.is_running = False
+            return []
+
+        bridge.telegram_manager.get_updates = fake_get_updates
+        bridge._dispatch_telegram_message = lambda message: None
+        bridge.is_running = True
+
+        with patch("asyncio.sleep", new=AsyncMock()):
+            await bridge._telegram_polling_task()
+
+        assert calls == [0, 12]
+
+    @pytest.mark.asyncio
+    async def test_repeated_message_reuses_rendered_chunks(self, bridge):
+        await bridge.create_session("s1", "111", "/tmp/a")
+
+        with patch.object(
+            bridge.message_chunker,
+            "chunk_message",
+            wraps=bridge.message_chunker.chunk_message,
+        ) as chunk_message:
+            await bridge.send_mcp_message_to_telegram("s1", "c1", "status ok")
+            await bridge.send_mcp_message_to_telegram("s1", "c2", "status ok")
+
+        assert chunk_message.call_count == 1
+        assert bridge.telegram_manager.sent[0] == bridge.telegram_manager.sent[1]
+
+
+class TestLifecycle:
+    """Bridge start/stop behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_background_tasks(self, bridge):
+        async def never_returns(offset=None, timeout=30):
+            await asyncio.sleep(3600)
+
+        async def connected():
+            return True, "ok"
+
+        bridge.telegram_manager.test_connection = connected
+        bridge.telegram_manager.get_updates = never_returns
+
+        assert await bridge.start()
+        tasks = list(bridge._background_tasks)
+
+        await asyncio.wait_for(bridge.stop(), timeout=1)
+
+        assert all(task.done() for task in tasks)
+        assert not bridge._background_tasks
+
+    @pytest.mark.asyncio
+    async def test_stop_closes_shared_telegram_session(self, bridge):
+        with patch.object(bridge_module, "close_shared_session", new=AsyncMock()) as close:
+            await bridge.stop()
+
+        close.assert_awaited_once()
+
+
+class TestMCPEventBatching:
+    """Coalescing of MCP events forwarded to Telegram"""
+
+    @pytest.mark.asyncio
+    async def test_burst_of_events_sent_as_one_message(self, bridge):
+        bridge.event_batch_window = 0.01
+        bridge.status = BridgeStatus.CONNECTED
+        await bridge.create_session("s1", "111", "/tmp/a")
+        sent_before = len(bridge.telegram_manager.sent)
+
+        for tool in ("tool_a", "tool_b", "tool_c"):
+            await bridge._handle_mcp_event(
+                MCPLogEntry(
+                    timestamp="t",
+                    event_type=MCPEventType.TOOL_CALL_START,
+                    tool_name=tool,
+                )
+            )
+        await bridge._flush_task
+
+        sent = bridge.telegram_manager.sent[sent_before:]
+        assert len(sent) == 1
+        assert all(tool in sent[0] for tool in ("tool_a", "tool_b", "tool_c"))
+
+
+class TestBridgeRegistry:
+    """Global and context-local bridge lookup"""
+
+    def test_context_bridge_overrides_global(self, bridge):
+        with use_bridge(bridge) as active:
+            assert active is bridge
+            assert get_bridge() is bridge
+
+        assert get_bridge() is not bridge
+
+    @pytest.mark.asyncio
+    async def test_override_visible_to_tasks_started_inside(self, bridge):
+        async def lookup():
+            return get_bridge()
+
+        with use_bridge(bridge):
+            task = asyncio.create_task(lookup())
+
+        assert await task is bridge
+        assert get_bridge() is not bridge
+
+    def test_initialized_bridge_visible_from_other_threads(self, monkeypatch):
+        monkeypatch.setattr(bridge_module, "_global_bridge", None)
+        initialized = initialize_bridge(FakeTelegramManager(), MCPLoggingMiddleware())
+
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(get_bridge()))
+        thread.start()
+        thread.join()
+
+        assert seen == [initialized]
@@ -0,0 +1,264 @@
+"""
+Message chunker tests
+
+Covers content type detection and the chunking strategies in MessageChunker.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from mcp_feedback_enhanced.utils.message_chunker import (
+    ChunkStrategy,
+    ChunkType,
+    MessageChunker,
+)
+
+
+@pytest.fixture
+def chunker():
+    return MessageChunker(max_chunk_size=100)
+
+
+class TestContentDetection:
+    """Content type detection"""
+
+    def test_detects_list(self, chunker):
+        content = "- one\n* two\n  • three\nplain"
+        assert chunker._detect_content_type(content) == ChunkType.LIST
+
+    @pytest.mark.parametrize(
+        "line,is_item",
+        [("- a", True), ("\t*\tb", True), ("•  c", True), ("-a", False), ("-", False), ("", False)],
+    )
+    def test_list_marker_matches_regex_semantics(self, chunker, line, is_item):
+        expected = ChunkType.LIST if is_item else ChunkType.TEXT
+        assert chunker._detect_content_type(line) == expected
+
+    def test_detects_table(self, chunker):
+        content = "a | b\n1 | 2\ntext\nmore\nlines"
+        assert chunker._detect_content_type(content) == ChunkType.TABLE
+
+    def test_list_takes_precedence_over_table(self, chunker):
+        content = "- a | b\n- c | d\n- e | f\nx | y"
+        assert chunker._detect_content_type(content) == ChunkType.LIST
+
+    @pytest.mark.parametrize("text", ["{'a': 1}", "{{ template }}", "[see below]"])
+    def test_non_json_brackets_skip_parser(self, chunker, text):
+        with patch("json.loads") as loads:
+            assert chunker._detect_content_type(text) == ChunkType.TEXT
+        loads.assert_not_called()
+
+    def test_json_with_unbalanced_braces_in_strings(self, chunker):
+        assert chunker._detect_content_type('{"open": "{", "list": [NaN]}') == ChunkType.JSON
+
+    def test_detects_json_and_code(self, chunker):
+        assert chunker._detect_content_type('{"a": 1}') == ChunkType.JSON
+        assert chunker._detect_content_type("x\n```py\nprint()\n```") == ChunkType.CODE
+        assert chunker._detect_content_type("{not json}") == ChunkType.TEXT
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [("**b**", True), ("*i*", True), ("__u__", True), ("~~s~~", True),
+         ("[a](b)", True), ("a * b", False), ("[a] (b)", False), ("plain", False)],
+    )
+    def test_markdown_detection_matches_individual_patterns(self, chunker, text, expected):
+        individual = any(p.search(text) for p in chunker.MARKDOWN_PATTERNS.values())
+        assert chunker._has_markdown(text) is expected is individual
+
+    def test_detection_cached_for_repeated_content(self, chunker):
+        content = "- a\n- b\n- c"
+
+        with patch.object(chunker, "_detect_content_type", wraps=chunker._detect_content_type) as detect:
+            first = chunker.chunk_message(content)
+            second = chunker.chunk_message(content)
+            chunker.chunk_message(content + "\n- d")
+
+        assert detect.call_count == 2
+        assert first[0].metadata == second[0].metadata
+
+    def test_detection_cache_is_bounded(self):
+        chunker = MessageChunker(cache_size=2)
+        for i in range(5):
+            chunker.chunk_message(f"message {i}")
+
+        assert len(chunker._type_cache) == 2
+        assert len(chunker._flag_cache) == 2
+
+
+class TestSentenceChunking:
+    """Sentence boundary chunking"""
+
+    def test_splits_on_sentence_boundaries(self, chunker):
+        content = " ".join(f"Sentence number {i} is here." for i in range(10))
+
+        chunks = chunker.chunk_message(content)
+
+        assert len(chunks) > 1
+        assert all(c.metadata.strategy_used == ChunkStrategy.SENTENCE_BOUNDARY for c in chunks)
+        assert all(len(c.content) <= 100 for c in chunks)
+        assert all(c.content.endswith(".") for c in chunks)
+        assert " ".join(c.content for c in chunks) == content
+
+    def test_oversized_word_falls_back_to_characters(self, chunker):
+        content = "short " + "x" * 250
+
+        chunks = chunker.chunk_message(content)
+
+        assert [c.content for c in chunks] == ["short", "x" * 100, "x" * 100, "x" * 50]
+        assert [c.metadata.chunk_length for c in chunks[1:]] == [100, 100, 50]
+        assert chunks[-1].metadata.strategy_used == ChunkStrategy.CHARACTER_BOUNDARY
+
+
+class TestParagraphChunking:
+    """Paragraph boundary chunking"""
+
+    def test_packs_paragraphs_and_splits_oversized(self, chunker):
+        long_paragraph = " ".join(f"Long sentence {i}." for i in range(12))
+        content = "\n\n".join(["First para.", "Second para.", long_paragraph, "Last."])
+
+        chunks = chunker.chunk_message(content)
+
+        assert chunks[0].content == "First para.\n\nSecond para."
+        assert chunks[-1].content == "Last."
+        assert all(len(c.content) <= 100 for c in chunks)
+        middle = chunks[1:-1]
+        assert all(c.metadata.strategy_used == ChunkStrategy.SENTENCE_BOUNDARY for c in middle)
+        assert " ".join(c.content for c in middle) == long_paragraph
+
+
+class TestCodeBlockChunking:
+    """Code block boundary chunking"""
+
+    def test_code_blocks_kept_whole_or_split_by_lines(self, chunker):
+        small = "```py\nprint(1)\n```"
+        large = "```py\n" + "\n".join(f"value_{i} = {i}" for i in range(20)) + "\n```"
+        content = "Intro text " * 5 + small + "\nMiddle\n" + large + "\nOutro"
+
+        chunks = chunker.chunk_message(content)
+
+        assert any(small in c.content for c in chunks)
+        code_chunks = [c for c in chunks if c.metadata.chunk_type == ChunkType.CODE and c.content.startswith("```py\nvalue_")]
+        assert len(code_chunks) > 1
+        assert all(c.content.endswith("\n```") and len(c.content) <= 100 for c in code_chunks)
+        bodies = [c.content[len("```py\n"):-len("\n```")] for c in code_chunks]
+        assert "\n".join(bodies) == large[len("```py\n"):-len("\n```")]
+        assert chunks[-1].content == "\nOutro"
+
+
+class TestChunkFlags:
+    """has_code / has_markdown flags on chunks"""
+
+    def test_plain_content_scanned_once(self, chunker):
+        content = " ".join(f"Plain sentence {i}." for i in range(20))
+
+        with patch.object(chunker, "_has_markdown", wraps=chunker._has_markdown) as has_markdown:
+            chunks = chunker.chunk_message(content)
+
+        assert len(chunks) > 1
+        assert has_markdown.call_count == 1
+        assert not any(c.metadata.has_markdown or c.metadata.has_code for c in chunks)
+
+    def test_flags_set_per_chunk_when_present(self, chunker):
+        content = "Some **bold** text here. " + "Plain words only. " * 10 + "Use `x` now."
+
+        chunks = chunker.chunk_message(content)
+
+        assert chunks[0].metadata.has_markdown
+        assert not chunks[1].metadata.has_markdown
+        assert chunks[-1].metadata.has_code
+        assert not chunks[0].metadata.has_code
+
+
+class TestStrategyDispatch:
+    """Strategy to chunking method mapping"""
+
+    def test_every_strategy_has_a_handler(self, chunker):
+        assert set(chunker._strategy_dispatch) == set(ChunkStrategy)
+
+    def test_dispatch_routes_to_strategy(self, chunker):
+        pieces = list(chunker._chunk_by_strategy("a b c", ChunkStrategy.WORD_BOUNDARY, ChunkType.TEXT))
+
+        assert pieces == [("a b c", ChunkType.TEXT, ChunkStrategy.WORD_BOUNDARY)]
+
+
+class TestIterChunkMessage:
+    """Streaming chunk generation"""
+
+    def test_yields_same_chunks_as_list_api(self, chunker):
+        content = "\n\n".join(f"Paragraph {i}. " + "word " * 15 for i in range(6))
+
+        streamed = list(chunker.iter_chunk_message(content, title="Report"))
+        listed = chunker.chunk_message(content, title="Report")
+
+        assert [c.content for c in streamed] == [c.content for c in listed]
+        assert [c.metadata.chunk_index for c in streamed] == list(range(len(listed)))
+        assert all(c.metadata.total_chunks == 0 for c in streamed[:-1])
+        assert streamed[-1].metadata.total_chunks == len(listed)
+        assert streamed[-1].metadata.continuation_marker is None
+        assert all(c.metadata.continuation_marker for c in streamed[:-1])
+        assert streamed[0].navigation_info == "📄 **Part 1**"
+        assert streamed[0].preview
+
+    def test_small_and_blank_content(self, chunker):
+        assert list(chunker.iter_chunk_message("   ")) == []
+
+        (chunk,) = chunker.iter_chunk_message("hi")
+        assert chunk.metadata.total_chunks == 1
+        assert chunk.navigation_info is None
+
+
+class TestJsonFormatting:
+    """JSON rendering for chunked output"""
+
+    def test_json_data_rendered_like_stdlib(self, chunker):
+        data = {"name": "回饋", "items": [1, 2]}
+
+        (chunk,) = MessageChunker().chunk_json_data(data)
+
+        assert chunk.content == "```json\n" + json.dumps(data, indent=2, ensure_ascii=False) + "\n```"
+        assert chunk.metadata.chunk_type == ChunkType.JSON
+
+    def test_mcp_result_rendered_indented(self, chunker):
+        text = chunker._format_mcp_response({"result": {"a": [1]}, "status": "ok"}, True)
+
+        assert text.startswith('{\n  "a": [\n    1\n  ]\n}')
+        assert text.endswith("**status:** ok")
+
+
+class TestContentPreview:
+    """Preview text generation"""
+
+    def test_preview_collapses_whitespace_and_truncates(self, chunker):
+        content = "  first\n\n\tsecond   third " + "word " * 10_000
+
+        preview = chunker._generate_content_preview(content, max_length=20)
+
+        assert preview == "first second thir..."
+
+    def test_preview_strips_markdown_markers(self, chunker):
+        preview = chunker._generate_content_preview("**Bold** `code` ~~old~~ __u__ *it*")
+
+        assert preview == "Bold code old u *it*"
+
+    def test_marker_split_at_scan_window_edge(self, chunker):
+        # The first 64-character window cuts the trailing "**" in half
+        content = "x" * 20 + " " * 43 + "**"
+
+        assert chunker._generate_content_preview(content, max_length=20) == "x" * 20
+
+    def test_short_preview_not_truncated(self, chunker):
+        assert chunker._generate_content_preview("a \n b", max_length=20) == "a b"
+
+
+class TestChunkDataclasses:
+    """MessageChunk / ChunkMetadata containers"""
+
+    def test_chunks_use_slots(self, chunker):
+        (chunk,) = chunker.chunk_message("hello")
+
+        assert not hasattr(chunk, "__dict__")
+        assert not hasattr(chunk.metadata, "__dict__")
+        with pytest.raises(AttributeError):
+            chunk.unexpected = True
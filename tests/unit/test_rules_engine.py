@@ -0,0 +1,367 @@
+"""
+Message type rules engine tests
+
+Covers rule matching, project filters and configuration merging in
+MessageTypeRulesEngine backed by a temporary rules directory.
+"""
+
+import re
+from unittest.mock import patch
+
+import pytest
+
+from mcp_feedback_enhanced.utils import rules_engine
+from mcp_feedback_enhanced.utils.rules_engine import MessageTypeRulesEngine
+from tests.helpers.test_utils import TestUtils
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return MessageTypeRulesEngine(str(tmp_path))
+
+
+make_rule = TestUtils.create_test_rule
+
+
+def save_rules(engine, rules):
+    engine.storage.save_rules({"version": "1.0", "rules": rules})
+    engine._invalidate_cache()
+
+
+class TestProjectFilters:
+    """Project filter matching"""
+
+    @pytest.mark.parametrize(
+        "patterns,directory,expected",
+        [
+            (["*proj*"], "/home/user/my-proj", True),
+            (["my-proj"], "/home/user/my-proj", True),
+            (["/home/*/src/*"], "/home/user/src/app", True),
+            (["other", "*.git"], "/home/user/repo.git", True),
+            (["other"], "/home/user/my-proj", False),
+            ([], "/home/user/my-proj", False),
+        ],
+    )
+    def test_specific_patterns(self, engine, patterns, directory, expected):
+        project_filter = {"type": "specific", "patterns": patterns}
+        assert engine._matches_project_filter(project_filter, directory) is expected
+
+    def test_exclude_patterns(self, engine):
+        project_filter = {"type": "exclude", "patterns": ["*secret*"]}
+
+        assert not engine._matches_project_filter(project_filter, "/srv/secret-app")
+        assert engine._matches_project_filter(project_filter, "/srv/public-app")
+
+    def test_regex_filters_compiled_once(self, engine):
+        project_filter = {"type": "regex", "pattern": r"/src/(web|api)$"}
+
+        with patch("re.compile", wraps=re.compile) as compile_regex:
+            assert engine._matches_project_filter(project_filter, "/home/src/web")
+            assert not engine._matches_project_filter(project_filter, "/home/src/cli")
+
+        assert compile_regex.call_count == 1
+
+    def test_invalid_regex_never_matches(self, engine):
+        project_filter = {"type": "regex", "pattern": "(unclosed"}
+
+        assert not engine._matches_project_filter(project_filter, "(unclosed")
+        assert engine._regex_cache == {"(unclosed": None}
+
+    def test_directory_normalized_once_per_lookup(self, engine):
+        save_rules(engine, [
+            make_rule(str(i), message_type="testing",
+                      project_filter={"type": "exclude", "patterns": [f"skip-{i}"]})
+            for i in range(5)
+        ])
+
+        with patch.object(engine, "_normalize_project", wraps=engine._normalize_project) as normalize:
+            assert len(engine.find_applicable_rules("testing", "/src/app")) == 5
+
+        assert normalize.call_count == 1
+
+    def test_compiled_patterns_reused(self, engine):
+        project_filter = {"type": "specific", "patterns": ["a*", "b*"]}
+
+        engine._matches_project_filter(project_filter, "/x/abc")
+        engine._matches_project_filter(project_filter, "/x/bcd")
+
+        assert list(engine._pattern_cache) == [("a*", "b*")]
+
+
+class TestFindApplicableRules:
+    """Rule selection by message type, state and priority"""
+
+    def test_only_rules_for_message_type_returned(self, engine):
+        save_rules(engine, [
+            make_rule("a", message_type="testing", priority=1),
+            make_rule("b", message_type="security", priority=5),
+            make_rule("c", message_type="testing", priority=9),
+            make_rule("d", message_type="testing", enabled=False),
+        ])
+
+        ids = [r["id"] for r in engine.find_applicable_rules("testing", "/p")]
+
+        assert ids == ["c", "a"]
+
+    def test_wildcard_rules_keep_file_order_on_ties(self, engine):
+        save_rules(engine, [
+            make_rule("any-1", message_type=""),
+            make_rule("typed", message_type="testing"),
+            make_rule("any-2", message_type=None),
+        ])
+
+        ids = [r["id"] for r in engine.find_applicable_rules("testing", "/p")]
+
+        assert ids == ["any-1", "typed", "any-2"]
+        assert [r["id"] for r in engine.find_applicable_rules("security", "/p")] == ["any-1", "any-2"]
+
+    def test_priority_order_across_typed_and_wildcard_rules(self, engine):
+        save_rules(engine, [
+            make_rule("any-5", message_type="", priority=5),
+            make_rule("typed-9", message_type="testing", priority=9),
+            make_rule("typed-1", message_type="testing", priority=1),
+            make_rule("any-9", message_type="", priority=9),
+        ])
+
+        ids = [r["id"] for r in engine.find_applicable_rules("testing", "/p")]
+
+        assert ids == ["typed-9", "any-9", "any-5", "typed-1"]
+        assert [r["id"] for r in engine._get_rules()["rules"]] == ["any-5", "typed-9", "typed-1", "any-9"]
+
+    def test_project_filter_applied(self, engine):
+        save_rules(engine, [
+            make_rule("all", message_type="testing", project_filter={"type": "all"}),
+            make_rule("web", message_type="testing", project_filter={"type": "specific", "patterns": ["web-*"]}),
+            make_rule("plain", message_type="testing"),
+        ])
+
+        assert [r["id"] for r in engine.find_applicable_rules("testing", "/src/web-app")] == ["all", "web", "plain"]
+        assert [r["id"] for r in engine.find_applicable_rules("testing", "/src/api")] == ["all", "plain"]
+
+    def test_index_rebuilt_after_rules_change(self, engine):
+        save_rules(engine, [make_rule("a", message_type="testing")])
+        assert engine.find_applicable_rules("testing", "/p")
+
+        save_rules(engine, [make_rule("a", message_type="security")])
+        assert engine.find_applicable_rules("testing", "/p") == []
+
+
+class TestApplyRules:
+    """Configuration merging and result reuse"""
+
+    BASE = {"auto_submit": False, "timeout": 600, "response_text": "body", "message_type": "testing"}
+
+    def test_repeated_call_reuses_result(self, engine):
+        save_rules(engine, [make_rule("a", message_type="testing", value=30)])
+
+        first = engine.apply_rules("testing", "/p", self.BASE)
+        with patch.object(engine, "_collect_effects") as collect:
+            second = engine.apply_rules("testing", "/p", self.BASE)
+
+        collect.assert_not_called()
+        assert first == second == {**self.BASE, "timeout": 30}
+        second["timeout"] = 1
+        assert engine.apply_rules("testing", "/p", self.BASE)["timeout"] == 30
+
+    def test_cache_independent_of_base_config(self, engine):
+        save_rules(engine, [
+            make_rule("a", message_type="testing", value=30),
+            make_rule("h", message_type="testing", rule_type="response_header", value="> "),
+        ])
+
+        first = engine.apply_rules("testing", "/p", {**self.BASE, "response_text": "one"})
+        with patch.object(engine, "_collect_effects") as collect:
+            second = engine.apply_rules("testing", "/p", {"response_text": "two", "extra": [1]})
+        collect.assert_not_called()
+
+        assert first["response_text"] == "> one"
+        assert second == {"response_text": "> two", "extra": [1], "timeout": 30}
+        assert len(engine._apply_cache) == 1
+        (effects,) = engine._apply_cache.values()
+        assert "one" not in repr(effects)
+
+    def test_equal_but_distinct_values_not_conflated(self, engine):
+        save_rules(engine, [make_rule("a", message_type="testing", value=30)])
+
+        first = engine.apply_rules("testing", "/p", {"auto_submit": 1})
+        second = engine.apply_rules("testing", "/p", {"auto_submit": True})
+
+        assert type(first["auto_submit"]) is int
+        assert second["auto_submit"] is True
+
+    def test_result_recomputed_after_rules_change(self, engine):
+        save_rules(engine, [make_rule("a", message_type="testing", value=30)])
+        assert engine.apply_rules("testing", "/p", self.BASE)["timeout"] == 30
+
+        save_rules(engine, [make_rule("a", message_type="testing", value=45)])
+        assert engine.apply_rules("testing", "/p", self.BASE)["timeout"] == 45
+
+    def test_headers_footers_and_overrides_merged(self, engine):
+        rules = [
+            make_rule("h1", rule_type="response_header", value="[1]", priority=9),
+            make_rule("t1", value=10, priority=8),
+            make_rule("f1", rule_type="response_footer", value="<1>", priority=7),
+            make_rule("h2", rule_type="response_header", value="[2]", priority=6),
+            make_rule("a1", rule_type="auto_submit_override", value=1, timeout_override=5, priority=5),
+            make_rule("f2", rule_type="response_footer", value="<2>", priority=4),
+        ]
+        for rule in rules:
+            rule["message_type"] = "testing"
+        save_rules(engine, rules)
+
+        config = engine.apply_rules("testing", "/p", self.BASE)
+
+        assert config == {**self.BASE, "response_text": "[2][1]body<1><2>", "timeout": 5, "auto_submit": True}
+
+    @pytest.mark.parametrize("response_text", [None, 5])
+    def test_non_string_response_text_keeps_other_overrides(self, engine, response_text):
+        rules = [
+            make_rule("h1", rule_type="response_header", value="[1]", priority=9),
+            make_rule("t1", value=10, priority=8),
+            make_rule("a1", rule_type="auto_submit_override", value=1, priority=7),
+        ]
+        for rule in rules:
+            rule["message_type"] = "testing"
+        save_rules(engine, rules)
+
+        config = engine.apply_rules("testing", "/p", {**self.BASE, "response_text": response_text})
+
+        assert config == {**self.BASE, "response_text": response_text, "timeout": 10, "auto_submit": True}
+
+    def test_custom_config_replacing_text_drops_earlier_decorations(self, engine):
+        # Storage validation rejects custom_config, so feed the rules directly
+        rules = [
+            {"rule_type": "response_header", "value": "[1]"},
+            {"rule_type": "custom_config", "value": {"response_text": "new", "timeout": 1}},
+            {"rule_type": "response_footer", "value": "<2>"},
+            {"rule_type": "timeout_override", "value": 7},
+        ]
+        overrides, headers, footers = {}, [], []
+        for rule in rules:
+            engine._apply_single_rule(rule, overrides, headers, footers)
+
+        assert overrides == {"response_text": "new", "timeout": 7}
+        assert (headers, footers) == ([], ["<2>"])
+
+    def test_every_rule_type_has_a_handler(self):
+        assert set(rules_engine._RULE_HANDLERS) == rules_engine._VALID_RULE_TYPES
+
+
+class TestRulesCache:
+    """Rules file change detection"""
+
+    def test_mtime_checked_at_most_once_per_interval(self, engine):
+        save_rules(engine, [make_rule("a")])
+
+        with patch("time.monotonic", return_value=1000.0):
+            engine._get_rules()
+            with patch.object(type(engine.storage.rules_file), "stat") as stat:
+                engine._get_rules()
+                engine._get_rules()
+        stat.assert_not_called()
+
+        with patch("time.monotonic", return_value=1001.0):
+            with patch.object(type(engine.storage.rules_file), "stat", side_effect=FileNotFoundError):
+                assert engine._get_rules()["rules"][0]["id"] == "a"
+
+    def test_invalidate_forces_reload(self, engine):
+        save_rules(engine, [make_rule("a")])
+        engine._get_rules()
+
+        save_rules(engine, [make_rule("b")])
+
+        assert [r["id"] for r in engine._get_rules()["rules"]] == ["b"]
+
+
+class TestRulesSummary:
+    """Rule statistics"""
+
+    def test_counts_by_type(self, engine):
+        save_rules(engine, [
+            make_rule("a", message_type="testing"),
+            make_rule("b", message_type="testing", rule_type="response_footer", value="x", enabled=False),
+            make_rule("c", message_type="security"),
+        ])
+
+        summary = engine.get_rules_summary()
+
+        assert summary["total_rules"] == 3
+        assert summary["enabled_rules"] == 2
+        assert summary["by_message_type"] == {"testing": 2, "security": 1}
+        assert summary["by_rule_type"] == {"timeout_override": 2, "response_footer": 1}
+        assert type(summary["by_message_type"]) is dict
+
+
+class TestRuleMutations:
+    """add_rule / update_rule / delete_rule"""
+
+    def ids(self, engine):
+        return [r["id"] for r in engine.storage.load_rules()["rules"]]
+
+    def test_add_update_delete(self, engine):
+        save_rules(engine, [make_rule("a"), make_rule("b")])
+
+        assert engine.add_rule(make_rule("c"))
+        assert not engine.add_rule(make_rule("a"))
+        assert engine.update_rule("b", {"value": 99})
+        assert not engine.update_rule("missing", {"value": 1})
+        assert engine.delete_rule("a")
+        assert not engine.delete_rule("a")
+
+        rules = engine.storage.load_rules()["rules"]
+        assert [r["id"] for r in rules] == ["b", "c"]
+        assert rules[0]["value"] == 99 and "updated_at" in rules[0]
+
+    def test_failed_update_leaves_cached_rules_untouched(self, engine):
+        save_rules(engine, [make_rule("a")])
+        cached = engine._get_rules()
+
+        assert not engine.update_rule("a", {"rule_type": "bogus"})
+
+        assert cached["rules"][0]["rule_type"] == "timeout_override"
+        assert self.ids(engine) == ["a"]
+
+    def test_saved_rules_cached_without_reload(self, engine):
+        save_rules(engine, [make_rule("a")])
+        engine._get_rules()
+
+        with patch.object(engine.storage, "load_rules", wraps=engine.storage.load_rules) as load:
+            assert engine.add_rule(make_rule("b"))
+            assert [r["id"] for r in engine.find_applicable_rules("general", "/p")] == ["a", "b"]
+
+        load.assert_not_called()
+
+
+class TestRuleMatchingReport:
+    """test_rule_matching diagnostics"""
+
+    RULES = [
+        make_rule("low", message_type="testing", priority=1),
+        make_rule("any", message_type="", priority=3),
+        make_rule("off", message_type="testing", enabled=False),
+        make_rule("other", message_type="security"),
+        make_rule("high", message_type="testing", priority=5,
+                  project_filter={"type": "exclude", "patterns": ["skip*"]}),
+    ]
+
+    def test_reports_reasons_for_non_matching_rules(self, engine):
+        save_rules(engine, [dict(rule) for rule in self.RULES])
+
+        results = engine.test_rule_matching("testing", "/src/skip-me")
+
+        assert [r["id"] for r in results["matching_rules"]] == ["low", "any"]
+        reasons = {r["id"]: r["non_match_reasons"] for r in results["non_matching_rules"]}
+        assert reasons == {
+            "off": ["disabled"],
+            "other": ["message_type_mismatch"],
+            "high": ["project_filter_mismatch"],
+        }
+
+    def test_matching_only_lists_applicable_rules_by_priority(self, engine):
+        save_rules(engine, [dict(rule) for rule in self.RULES])
+
+        results = engine.test_rule_matching("testing", "/src/app", include_non_matching=False)
+
+        assert [r["id"] for r in results["matching_rules"]] == ["high", "any", "low"]
+        assert results["non_matching_rules"] == []
+        assert results["total_rules"] == 5
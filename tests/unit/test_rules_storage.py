@@ -0,0 +1,232 @@
+"""
+Rules storage tests
+
+Covers persistence, backups and storage info in RulesStorage using a
+temporary storage directory.
+"""
+
+import json
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from mcp_feedback_enhanced.utils import json_utils
+from mcp_feedback_enhanced.utils.rules_storage import RulesStorage
+from tests.helpers.test_utils import TestUtils
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return RulesStorage(str(tmp_path))
+
+
+make_rule = TestUtils.create_test_rule
+
+
+class TestPersistence:
+    """Loading and saving the rules file"""
+
+    def test_default_rules_created(self, storage):
+        data = storage.load_rules()
+
+        assert data["version"] == "1.0"
+        assert len(data["rules"]) == 5
+        assert storage.rules_file.exists()
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_file_written_as_indented_utf8_json(self, storage, use_orjson):
+        if use_orjson and not json_utils.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+        data = {"version": "1.0", "rules": [make_rule("a", value="回饋")]}
+
+        with patch.object(json_utils, "orjson", json_utils.orjson if use_orjson else None):
+            storage.save_rules(data)
+            loaded = storage.load_rules()
+
+        text = storage.rules_file.read_text(encoding="utf-8")
+        assert text == json.dumps(data, indent=2, ensure_ascii=False)
+        assert loaded == data
+
+    def test_save_syncs_file_and_directory(self, storage):
+        with patch("os.fsync") as fsync:
+            storage.save_rules({"version": "1.0", "rules": [make_rule("a")]})
+        assert fsync.call_count == 2
+
+        with patch("os.fsync") as fsync:
+            storage.save_rules({"version": "1.0", "rules": [make_rule("b")]}, fsync=False)
+        fsync.assert_not_called()
+
+        assert [r["id"] for r in storage.load_rules()["rules"]] == ["b"]
+        assert not storage.rules_file.with_suffix(".tmp").exists()
+
+    @pytest.mark.asyncio
+    async def test_async_save_runs_off_the_event_loop(self, storage):
+        main_thread = threading.get_ident()
+        save_threads = []
+        save_rules = storage.save_rules
+
+        def recording_save(*args):
+            save_threads.append(threading.get_ident())
+            return save_rules(*args)
+
+        with patch.object(storage, "save_rules", side_effect=recording_save):
+            assert await storage.save_rules_async({"version": "1.0", "rules": [make_rule("a")]})
+
+        assert save_threads and save_threads[0] != main_thread
+        assert [r["id"] for r in storage.load_rules()["rules"]] == ["a"]
+
+    def test_unchanged_file_not_reread(self, storage):
+        storage.load_rules()
+
+        with patch("pathlib.Path.read_bytes") as read_bytes:
+            first = storage.load_rules()
+            second = storage.load_rules()
+        read_bytes.assert_not_called()
+
+        assert first == second and first is not second
+        first["rules"].clear()
+        assert len(storage.load_rules()["rules"]) == 5
+
+    def test_saved_bytes_reused_by_next_load(self, storage):
+        storage.save_rules({"version": "1.0", "rules": [make_rule("a")]})
+
+        with patch("pathlib.Path.read_bytes") as read_bytes:
+            data = storage.load_rules()
+
+        read_bytes.assert_not_called()
+        assert [r["id"] for r in data["rules"]] == ["a"]
+        assert storage._cache[0] == storage._file_key()
+
+    def test_reload_after_external_change(self, storage):
+        storage.load_rules()
+        storage.rules_file.write_text(json.dumps({"version": "1.0", "rules": [make_rule("x")]}))
+
+        assert [r["id"] for r in storage.load_rules()["rules"]] == ["x"]
+
+    def test_default_rules_share_one_timestamp(self, storage):
+        data = storage.load_rules()
+
+        assert {r["created_at"] for r in data["rules"]} == {data["created_at"]}
+
+
+class TestBackups:
+    """Backups taken before each save"""
+
+    def backups(self, storage):
+        return sorted(storage.backup_dir.glob("rules_backup_*.json"))
+
+    def test_backup_keeps_previous_contents(self, storage):
+        previous = storage.rules_file.read_bytes()
+
+        storage.save_rules({"version": "1.0", "rules": [make_rule("a")]})
+
+        (backup,) = self.backups(storage)
+        assert backup.read_bytes() == previous
+        assert storage.rules_file.read_bytes() != previous
+
+    def test_falls_back_to_copy_without_hard_links(self, storage):
+        previous = storage.rules_file.read_bytes()
+
+        with patch("os.link", side_effect=OSError("not supported")):
+            storage.save_rules({"version": "1.0", "rules": [make_rule("a")]})
+
+        (backup,) = self.backups(storage)
+        assert backup.read_bytes() == previous
+
+    def test_only_ten_most_recent_backups_kept(self, storage):
+        for i in range(12):
+            path = storage.backup_dir / f"rules_backup_2024010{i // 10}_{i:06d}.json"
+            path.write_text("{}")
+            # Age comes from the name, not the mtime
+            os.utime(path, ns=((12 - i) * 10**9, (12 - i) * 10**9))
+        (storage.backup_dir / "notes.txt").write_text("keep me")
+
+        storage._cleanup_old_backups()
+
+        names = [p.name for p in self.backups(storage)]
+        assert len(names) == 10
+        assert "rules_backup_20240100_000000.json" not in names
+        assert "rules_backup_20240100_000001.json" not in names
+        assert (storage.backup_dir / "notes.txt").exists()
+        assert storage.get_storage_info()["backup_count"] == 10
+
+
+class TestStorageInfo:
+    """get_storage_info statistics"""
+
+    def test_info_reflects_saved_rules(self, storage):
+        storage.save_rules({"version": "1.0", "rules": [make_rule("a"), make_rule("b")]})
+
+        info = storage.get_storage_info()
+
+        assert info["rules_count"] == 2
+        assert info["version"] == "1.0"
+        assert info["updated_at"]
+        assert info["backup_count"] == 1
+        assert info["file_size"] == storage.rules_file.stat().st_size
+
+    def test_unchanged_file_not_reparsed(self, storage):
+        storage.get_storage_info()
+
+        with patch.object(storage, "load_rules", wraps=storage.load_rules) as load_rules:
+            info = storage.get_storage_info()
+
+        load_rules.assert_not_called()
+        assert info["rules_count"] == 5
+
+
+class TestNoOpSaves:
+    """Saving rules identical to what is stored"""
+
+    def test_identical_save_skips_write_and_backup(self, storage):
+        data = {"version": "1.0", "rules": [make_rule("a")]}
+        storage.save_rules(dict(data))
+        key = storage._file_key()
+
+        assert storage.save_rules(dict(data))
+
+        assert storage._file_key() == key
+        assert len(storage._list_backups()) == 1
+
+    def test_changed_rules_are_written(self, storage):
+        storage.save_rules({"version": "1.0", "rules": [make_rule("a")]})
+        key = storage._file_key()
+
+        storage.save_rules({"version": "1.0", "rules": [make_rule("a", value=61)]})
+
+        assert storage._file_key() != key
+        assert storage.load_rules()["rules"][0]["value"] == 61
+
+    def test_reloaded_defaults_are_not_rewritten(self, storage):
+        key = storage._file_key()
+
+        storage.save_rules(storage.load_rules())
+
+        assert storage._file_key() == key
+        assert storage._list_backups() == []
+
+    @pytest.mark.parametrize("content", ["{corrupt", "[1, 2]"])
+    def test_save_replaces_unparseable_file(self, storage, content):
+        storage.rules_file.write_text(content, encoding="utf-8")
+
+        assert storage.save_rules({"version": "1.0", "rules": [make_rule("a")]})
+
+        assert [rule["id"] for rule in storage.load_rules()["rules"]] == ["a"]
+
+
+class TestValidation:
+    """Rule validation on save"""
+
+    @pytest.mark.parametrize(
+        "rule,message",
+        [
+            ({"id": "a", "name": "a", "message_type": "general", "rule_type": "timeout_override"},
+             "Rule 0 missing required field: value"),
+            (make_rule("a", rule_type="bogus"), "Rule 0 has invalid rule_type: bogus"),
+        ],
+    )
+    def test_invalid_rules_rejected(self, storage, rule, message):
+        with pytest.raises(ValueError, match=message):
+            storage._validate_rules_data({"version": "1.0", "rules": [rule]})
@@ -0,0 +1,417 @@
+"""
+Telegram manager tests
+
+Covers rate limiting, message chunking and formatting helpers in
+telegram_manager without talking to the Telegram API.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from mcp_feedback_enhanced.utils import json_utils
+from mcp_feedback_enhanced.utils import telegram_manager as telegram_module
+from mcp_feedback_enhanced.utils.telegram_manager import (
+    TelegramBotManager,
+    TelegramMessageChunker,
+    TelegramRateLimiter,
+    close_shared_session,
+    send_telegram_message,
+)
+
+REAL_SLEEP = asyncio.sleep
+
+
+class FakeResponse:
+    """aiohttp response stand-in returning a canned JSON body"""
+
+    def __init__(self, body, status=200):
+        self.body = body
+        self.status = status
+
+    async def read(self):
+        return json_utils.dumps_bytes(self.body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """aiohttp ClientSession stand-in that records requests"""
+
+    def __init__(self):
+        self.requests = []
+        self._next_id = 0
+
+    def _respond(self, method, url, kwargs):
+        self.requests.append((method, url.rsplit("/", 1)[-1], kwargs))
+        self._next_id += 1
+        return FakeResponse({"ok": True, "result": {"message_id": self._next_id}})
+
+    def post(self, url, **kwargs):
+        return self._respond("POST", url, kwargs)
+
+    def get(self, url, **kwargs):
+        return self._respond("GET", url, kwargs)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def manager():
+    manager = TelegramBotManager("123:abc", "42")
+    manager.session = FakeSession()
+    return manager
+
+
+class TestRateLimiter:
+    """Token bucket rate limiting"""
+
+    @pytest.mark.asyncio
+    async def test_burst_up_to_capacity_then_limited(self):
+        with patch("time.monotonic", return_value=1000.0):
+            limiter = TelegramRateLimiter(max_requests=3, time_window=60)
+            assert [await limiter.acquire() for _ in range(4)] == [True, True, True, False]
+            assert limiter.get_retry_after() == 20
+
+    @pytest.mark.asyncio
+    async def test_tokens_refill_over_time(self):
+        with patch("time.monotonic", return_value=1000.0):
+            limiter = TelegramRateLimiter(max_requests=2, time_window=10)
+            assert await limiter.acquire()
+            assert await limiter.acquire()
+            assert not await limiter.acquire()
+
+        with patch("time.monotonic", return_value=1004.0):
+            assert limiter.get_retry_after() == 1
+        with patch("time.monotonic", return_value=1005.0):
+            assert limiter.get_retry_after() == 0
+            assert await limiter.acquire()
+            assert not await limiter.acquire()
+
+    @pytest.mark.asyncio
+    async def test_idle_time_does_not_exceed_capacity(self):
+        with patch("time.monotonic", return_value=1000.0):
+            limiter = TelegramRateLimiter(max_requests=2, time_window=10)
+        with patch("time.monotonic", return_value=5000.0):
+            assert [await limiter.acquire() for _ in range(3)] == [True, True, False]
+
+
+class TestMessageChunker:
+    """Splitting messages to the Telegram length limit"""
+
+    def test_paragraphs_packed_then_sentences_then_characters(self):
+        chunker = TelegramMessageChunker(max_length=20)
+        text = "one\n\ntwo\n\n" + "First bit. Second bit! " + "x" * 25
+
+        chunks = chunker._chunk_with_formatting(text)
+
+        assert chunks == ["one\n\ntwo", "First bit.", "Second bit!", "x" * 20, "x" * 5]
+
+    def test_chunks_labelled_when_split(self):
+        chunker = TelegramMessageChunker(max_length=30)
+
+        chunks = chunker.chunk_message("alpha beta.\n\n" + "gamma delta. " * 3)
+
+        assert chunks[0].startswith("📄 Part 1/")
+        assert all(len(chunk) <= 30 for chunk in chunks)
+
+    def test_code_block_split_on_lines(self):
+        chunker = TelegramMessageChunker(max_length=24)
+        code = "\n".join(["a = 1", "b = 2", "c = 3", "long_line_" * 3])
+
+        chunks = chunker.chunk_code_block(code, "py")
+
+        assert chunks == [
+            "```py\na = 1\nb = 2\n```",
+            "```py\nc = 3\n```",
+            "```py\nlong_line_long\n```",
+            "```py\n_line_long_lin\n```",
+            "```py\ne_\n```",
+        ]
+
+
+class FakeClock:
+    """Monotonic clock advanced only by patched asyncio.sleep calls"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+        await REAL_SLEEP(0)
+
+
+class TestRateLimiterWait:
+    """Queued waiting for a request slot"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_waiters_released_one_per_token(self):
+        clock = FakeClock()
+        with patch("time.monotonic", clock.monotonic), patch("asyncio.sleep", clock.sleep):
+            limiter = TelegramRateLimiter(max_requests=2, time_window=10)
+            released = []
+
+            async def sender():
+                await limiter.wait()
+                released.append(clock.now - 1000.0)
+
+            await asyncio.gather(*(sender() for _ in range(5)))
+
+        assert released == pytest.approx([0, 0, 5, 10, 15])
+        assert clock.sleeps == pytest.approx([5, 5, 5])
+
+
+class TestSending:
+    """Message and file sending"""
+
+    @pytest.mark.asyncio
+    async def test_send_waits_for_rate_limiter_then_posts_once(self, manager):
+        manager.rate_limiter.wait = AsyncMock()
+
+        result = await manager.send_message("hi")
+
+        assert result == {"message_id": 1}
+        manager.rate_limiter.wait.assert_awaited_once()
+        assert len(manager.session.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_message_payload_sent_as_json_bytes(self, manager):
+        await manager.send_message("回饋 ✓", parse_mode=None, reply_to_message_id=9)
+
+        (_, method, kwargs) = manager.session.requests[0]
+        assert method == "sendMessage"
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+        assert json_utils.loads(kwargs["data"]) == {
+            "chat_id": "42",
+            "text": "回饋 ✓",
+            "disable_web_page_preview": True,
+            "reply_to_message_id": 9,
+        }
+
+    @pytest.mark.asyncio
+    async def test_file_send_waits_for_rate_limiter(self, manager, tmp_path):
+        path = tmp_path / "report.txt"
+        path.write_text("data")
+        manager.rate_limiter.wait = AsyncMock()
+
+        result = await manager.send_file(str(path))
+
+        assert result == {"message_id": 1}
+        manager.rate_limiter.wait.assert_awaited_once()
+        assert [r[1] for r in manager.session.requests] == ["sendDocument"]
+
+    @pytest.mark.asyncio
+    async def test_chunks_sent_in_order_without_fixed_delays(self, manager):
+        manager.message_chunker.max_length = 60
+        text = "\n\n".join(f"Paragraph {i} " + "x" * 20 for i in range(4))
+
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            results = await manager.send_chunked_message(text, parse_mode=None)
+            await manager.send_code_block("a = 1\n" * 10, "py", caption="code")
+
+        sleep.assert_not_awaited()
+        assert [r["message_id"] for r in results] == [1, 2, 3, 4]
+        texts = [json_utils.loads(r[2]["data"])["text"] for r in manager.session.requests]
+        assert [t.split("\n")[0] for t in texts[:4]] == [f"📄 Part {i}/4" for i in range(1, 5)]
+        assert texts[4] == "code"
+        assert all(t.startswith("```py\n") for t in texts[5:])
+
+
+class TestPolling:
+    """Long-poll loop in start_polling"""
+
+    @pytest.mark.asyncio
+    async def test_polls_again_immediately_after_updates(self, manager):
+        calls = []
+        handled = []
+
+        async def fake_get_updates(offset=None, timeout=30):
+            calls.append(offset)
+            if len(calls) == 2:
+                manager.stop_polling()
+            return [{"update_id": 10 + len(calls), "message": {"text": "hi"}}]
+
+        async def handler(message):
+            handled.append(message["text"])
+
+        manager.get_updates = fake_get_updates
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            await manager.start_polling(handler)
+
+        sleep.assert_not_awaited()
+        assert calls == [1, 12]
+        assert handled == ["hi", "hi"]
+
+    @pytest.mark.asyncio
+    async def test_failures_back_off_exponentially_and_reset(self, manager):
+        outcomes = [[], RuntimeError("down"), [], [], [{"update_id": 5}], [], []]
+
+        async def fake_get_updates(offset=None, timeout=30):
+            outcome = outcomes.pop(0)
+            if not outcomes:
+                manager.stop_polling()
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        manager.get_updates = fake_get_updates
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            await manager.start_polling()
+
+        assert [call.args[0] for call in sleep.await_args_list] == [1, 2, 4, 8, 1, 2]
+
+
+class TestLifecycle:
+    """Session setup and teardown"""
+
+    @pytest.mark.asyncio
+    async def test_session_uses_pooled_keepalive_connector(self):
+        manager = TelegramBotManager("123:abc", "42", {"connection_pool_size": 5})
+
+        async with manager:
+            connector = manager.session.connector
+            assert connector.limit == 5
+            assert connector.limit_per_host == 5
+            assert connector.use_dns_cache
+
+        assert manager.session is None
+
+    @pytest.mark.asyncio
+    async def test_caller_session_left_open(self):
+        session = FakeSession()
+        session.close = AsyncMock()
+        manager = TelegramBotManager("123:abc", "42", session=session)
+
+        async with manager:
+            assert manager.session is session
+
+        session.close.assert_not_awaited()
+        assert manager.session is None
+
+
+class TestConvenienceFunctions:
+    """Module-level helpers sharing one HTTP session"""
+
+    @pytest.mark.asyncio
+    async def test_consecutive_sends_share_a_session(self):
+        sessions = []
+
+        async def fake_send(self, text, **kwargs):
+            sessions.append(self.session)
+            return {"message_id": 1}
+
+        try:
+            with patch.object(TelegramBotManager, "send_message", fake_send):
+                await send_telegram_message("123:abc", "42", "one")
+                await send_telegram_message("123:abc", "7", "two")
+
+            assert sessions[0] is sessions[1]
+            assert not sessions[0].closed
+        finally:
+            await close_shared_session()
+
+        assert sessions[0].closed
+        assert telegram_module._shared_session is None
+
+    @pytest.mark.asyncio
+    async def test_session_from_finished_loop_released_on_switch(self):
+        stale = []
+        thread = threading.Thread(
+            target=lambda: stale.append(asyncio.run(telegram_module._get_shared_session()))
+        )
+        thread.start()
+        thread.join()
+        (stale,) = stale
+
+        try:
+            current = await telegram_module._get_shared_session()
+
+            assert current is not stale
+            assert stale.closed
+        finally:
+            await close_shared_session()
+
+    @pytest.mark.asyncio
+    async def test_session_on_running_loop_closed_on_its_loop(self):
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+            other = asyncio.run_coroutine_threadsafe(
+                telegram_module._get_shared_session(), other_loop
+            ).result(timeout=5)
+
+            current = await telegram_module._get_shared_session()
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0), other_loop).result(timeout=5)
+
+            assert current is not other
+            assert other.closed
+        finally:
+            await close_shared_session()
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+
+
+class TestFormatting:
+    """Message formatting helpers"""
+
+    def test_mcp_message_layout(self, manager):
+        with patch.object(telegram_module, "datetime") as fake_datetime:
+            fake_datetime.now.return_value = datetime(2024, 5, 6, 7, 8, 9, 123456)
+            text = manager.format_mcp_message(
+                "interactive_feedback",
+                "Done.",
+                session_id="0123456789abcdef",
+                project_directory="/" + "p" * 60,
+                include_project_path=True,
+            )
+
+        assert text == (
+            "🤖 **MCP Tool Call**\n\n"
+            "**Tool:** `interactive_feedback`\n"
+            "**Time:** 2024-05-06 07:08:09\n"
+            "**Session:** `01234567...`\n"
+            "**Project:** `..." + "p" * 47 + "`\n\n"
+            "**Summary:**\nDone.\n\n"
+            "---\n💬 Please provide your feedback..."
+        )
+
+    def test_mcp_message_optional_lines_omitted(self, manager):
+        text = manager.format_mcp_message("tool", "s", include_timestamp=False)
+
+        assert text == "🤖 **MCP Tool Call**\n\n**Tool:** `tool`\n\n**Summary:**\ns\n\n---\n💬 Please provide your feedback..."
+
+    def test_escape_markdown_v2(self):
+        text = "a_b*c[d](e)~f`g>h#i+j-k=l|m{n}o.p!q\\r"
+
+        escaped = TelegramBotManager.escape_markdown_v2(text)
+
+        assert escaped == "a\\_b\\*c\\[d\\]\\(e\\)\\~f\\`g\\>h\\#i\\+j\\-k\\=l\\|m\\{n\\}o\\.p\\!q\\r"
+
+    @pytest.mark.parametrize(
+        "token,valid",
+        [("123:abc_DEF-9", True), ("abc:def", False), ("123:", False), ("123:a b", False)],
+    )
+    def test_validate_bot_token(self, token, valid):
+        assert TelegramBotManager.validate_bot_token(token) is valid
+
+    @pytest.mark.parametrize(
+        "chat_id,valid",
+        [("42", True), ("-1001", True), ("@my_chat", True), ("@bad-name", False), ("4x", False)],
+    )
+    def test_validate_chat_id(self, chat_id, valid):
+        assert TelegramBotManager.validate_chat_id(chat_id) is valid
@@ -0,0 +1,54 @@
+"""
+Telegram route tests
+
+Covers the Telegram dashboard JSON API against an in-memory bridge.
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mcp_feedback_enhanced.utils.logging_middleware import MCPLoggingMiddleware
+from mcp_feedback_enhanced.utils.mcp_telegram_bridge import MCPTelegramBridge
+from mcp_feedback_enhanced.web.routes import telegram_routes
+from mcp_feedback_enhanced.web.routes.telegram_routes import setup_telegram_routes
+
+
+@pytest.fixture
+def bridge():
+    return MCPTelegramBridge(None, MCPLoggingMiddleware())
+
+
+@pytest.fixture
+def client(bridge):
+    app = FastAPI()
+    setup_telegram_routes(app, None)
+    with patch.object(telegram_routes, "get_bridge", return_value=bridge):
+        yield TestClient(app)
+
+
+class TestSessionsEndpoint:
+    """GET /telegram/api/sessions"""
+
+    @pytest.mark.asyncio
+    async def test_lists_active_sessions(self, bridge, client):
+        await bridge.create_session("s1", "111", "/tmp/a")
+
+        response = client.get("/telegram/api/sessions")
+
+        assert response.status_code == 200
+        (session,) = response.json()["sessions"]
+        assert session["session_id"] == "s1"
+        assert session["chat_id"] == "111"
+        assert not session["is_expired"]
+        last_activity = datetime.fromisoformat(session["last_activity"])
+        assert last_activity >= datetime.fromisoformat(session["start_time"])
+
+    def test_empty_without_sessions(self, client):
+        response = client.get("/telegram/api/sessions")
+
+        assert response.status_code == 200
+        assert response.json() == {"sessions": []}